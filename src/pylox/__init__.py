@@ -1,15 +1,19 @@
 import builtins
-from inspect import getframeinfo, stack
+import sys
 from pathlib import Path
 from typing import Any
 
+# Stripped from the file names printed by dbg
+PROJECT_ROOT = str(Path(__file__).parents[2].resolve())
+
 
 def dbg(*messages: Any, sep: str = " ") -> None:
-    caller = getframeinfo(stack()[1][0])
-    file_name = str(Path(caller.filename).resolve()).replace(
-        str(Path(__file__).parents[2].resolve()), ""
-    )
-    print(f"[{file_name[1:]}:{caller.lineno}] {sep.join(map(str, messages))}")
+    caller = sys._getframe(1)
+    # Resolved like the root, so that symlinked or relative paths to the checkout are stripped too
+    file_name = str(Path(caller.f_code.co_filename).resolve())
+    if file_name.startswith(PROJECT_ROOT):
+        file_name = file_name[len(PROJECT_ROOT) + 1 :]
+    print(f"[{file_name}:{caller.f_lineno}] {sep.join(map(str, messages))}")
 
 
 builtins.dbg = dbg  # type: ignore [attr-defined]
@@ -6,38 +6,52 @@ from pylox.scanner import Token, TokenType
 
 class AstPrinter(ExprVisitor):
     def print(self, expr: Expr) -> str:
-        return expr.accept(self)
-
-    def visit_binary_expr(self, expr: Binary) -> str:
+        # Visit methods return the parts of the output with the subexpressions in their places,
+        # which are expanded until only strings are left
+        out: list[str] = []
+        work: list[str | Expr] = [expr]
+        while work:
+            item = work.pop()
+            if isinstance(item, str):
+                out.append(item)
+            else:
+                work.extend(reversed(item.accept(self)))
+        return "".join(out)
+
+    def visit_binary_expr(self, expr: Binary) -> list[str | Expr]:
         return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
 
-    def visit_grouping_expr(self, expr: Grouping) -> str:
+    def visit_grouping_expr(self, expr: Grouping) -> list[str | Expr]:
         return self.parenthesize("group", expr.expression)
 
-    def visit_literal_expr(self, expr: Literal) -> str:
+    def visit_literal_expr(self, expr: Literal) -> list[str | Expr]:
         if expr.value is None:
-            return "nil"
-        return str(expr.value)
+            return ["nil"]
+        return [str(expr.value)]
 
-    def visit_unary_expr(self, expr: Unary) -> str:
+    def visit_unary_expr(self, expr: Unary) -> list[str | Expr]:
         return self.parenthesize(expr.operator.lexeme, expr.right)
 
-    def visit_conditional_expr(self, expr: Conditional) -> str:
+    def visit_conditional_expr(self, expr: Conditional) -> list[str | Expr]:
         return self.parenthesize("conditional", expr.condition, expr.if_true, expr.if_false)
 
-    def parenthesize(self, name: str, *exprs: Expr) -> str:
-        expr_str = " ".join(str(e.accept(self)) for e in exprs)
-        return f"({name} {expr_str})"
+    def parenthesize(self, name: str, *exprs: Expr) -> list[str | Expr]:
+        parts: list[str | Expr] = ["(", name]
+        for e in exprs:
+            parts.append(" ")
+            parts.append(e)
+        parts.append(")")
+        return parts
 
 
 # Just a sample main from 5.4
 def main() -> None:
     expressions = Binary(
         Unary(
-            Token(TokenType.MINUS, "-", None, 1),
+            Token(TokenType.MINUS, "-", 1),
             Literal(123),
         ),
-        Token(TokenType.STAR, "*", None, 1),
+        Token(TokenType.STAR, "*", 1),
         Grouping(Literal(45.67)),
     )
     print(AstPrinter().print(expressions))
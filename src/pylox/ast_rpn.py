@@ -10,29 +10,39 @@ from pylox.scanner import Token, TokenType
 
 class RPNPrinter(ExprVisitor):
     def print(self, expr: Expr) -> str:
-        return expr.accept(self)
-
-    def visit_binary_expr(self, expr: Binary) -> str:
-        return f"{expr.left.accept(self)} {expr.right.accept(self)} {expr.operator.lexeme}"
-
-    def visit_grouping_expr(self, expr: Grouping) -> str:
-        return expr.expression.accept(self)
-
-    def visit_literal_expr(self, expr: Literal) -> str:
+        # Visit methods return the parts of the output with the subexpressions in their places,
+        # which are expanded until only strings are left
+        out: list[str] = []
+        work: list[str | Expr] = [expr]
+        while work:
+            item = work.pop()
+            if isinstance(item, str):
+                out.append(item)
+            else:
+                work.extend(reversed(item.accept(self)))
+        return "".join(out)
+
+    def visit_binary_expr(self, expr: Binary) -> list[str | Expr]:
+        return [expr.left, " ", expr.right, " ", expr.operator.lexeme]
+
+    def visit_grouping_expr(self, expr: Grouping) -> list[str | Expr]:
+        return [expr.expression]
+
+    def visit_literal_expr(self, expr: Literal) -> list[str | Expr]:
         if expr.value is None:
-            return "nil"
-        return str(expr.value)
+            return ["nil"]
+        return [str(expr.value)]
 
-    def visit_unary_expr(self, expr: Unary) -> str:
-        return f"{expr.operator.lexeme}{expr.right.accept(self)}"
+    def visit_unary_expr(self, expr: Unary) -> list[str | Expr]:
+        return [expr.operator.lexeme, expr.right]
 
 
 def main() -> None:
     # (1 + 2) * (4 - 3)
     expression = Binary(
-        Grouping(Binary(Literal(1), Token(TokenType.PLUS, "+", None, 1), Literal(2))),
-        Token(TokenType.STAR, "*", None, 1),
-        Grouping(Binary(Literal(4), Token(TokenType.MINUS, "-", None, 1), Literal(3))),
+        Grouping(Binary(Literal(1), Token(TokenType.PLUS, "+", 1), Literal(2))),
+        Token(TokenType.STAR, "*", 1),
+        Grouping(Binary(Literal(4), Token(TokenType.MINUS, "-", 1), Literal(3))),
     )
     # 1 2 + 4 3 - *
     print(RPNPrinter().print(expression))
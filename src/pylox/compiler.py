@@ -0,0 +1,228 @@
+"""Bytecode compiler for expression trees
+
+Flattens expression trees into a chunk of bytecode, which the interpreter runs in a single loop
+instead of dispatching through the visitor for every node. Rare nodes that need the interpreter
+state are embedded as they are and evaluated by walking the tree.
+"""
+
+from array import array
+from typing import Any
+
+from pylox.error import PyloxError
+from pylox.expr import (
+    Assign,
+    Binary,
+    Call,
+    Conditional,
+    Expr,
+    ExprVisitor,
+    Get,
+    Grouping,
+    Lambda,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from pylox.scanner import Token, TokenType
+
+# Opcodes, operands are stored in the following bytes
+OP_CONSTANT = 0  # constant index
+OP_GET_LOCAL = 1  # constant index of (distance, slot)
+OP_SET_LOCAL = 2  # constant index of (distance, slot)
+OP_GET_GLOBAL = 3  # constant index of name token
+OP_SET_GLOBAL = 4  # constant index of name token
+OP_POP = 5
+OP_EQUAL = 6
+OP_NOT_EQUAL = 7
+OP_GREATER = 8  # constant index of operator token, same for the rest of the binary operators
+OP_GREATER_EQUAL = 9
+OP_LESS = 10
+OP_LESS_EQUAL = 11
+OP_ADD = 12
+OP_SUBTRACT = 13
+OP_MULTIPLY = 14
+OP_DIVIDE = 15
+OP_NOT = 16
+OP_NEGATE = 17  # constant index of operator token
+OP_JUMP = 18  # 2 byte forward offset
+OP_JUMP_IF_FALSE = 19  # 2 byte forward offset, condition is left on the stack
+OP_CALL = 20  # constant index of (paren token, argument count)
+OP_GET_PROPERTY = 21  # constant index of name token
+OP_EVAL = 22  # constant index of expression to walk
+OP_RETURN = 23
+
+BINARY_OPCODES: dict[TokenType, int] = {
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.STAR: OP_MULTIPLY,
+    TokenType.SLASH: OP_DIVIDE,
+}
+
+MIN_INSTRUCTIONS = 6
+MAX_CONSTANTS = 256
+MAX_JUMP = 0xFFFF
+
+
+class CompileError(PyloxError):
+    """Expression can't be compiled, it has to be interpreted by walking the tree"""
+
+
+class Chunk:
+    __slots__ = ("code", "constants")
+
+    def __init__(self) -> None:
+        self.code = array("B")
+        self.constants: list[Any] = []
+
+
+class Compiler(ExprVisitor):
+    __slots__ = ("chunk", "instructions")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.chunk = Chunk()
+        self.instructions = 0
+
+    def compile(self, expr: Expr) -> Chunk | None:
+        """Compile expression into a chunk, or return None if it has to be walked"""
+        self.chunk = Chunk()
+        self.instructions = 0
+        try:
+            expr.accept(self)
+        except CompileError:
+            return None
+        # Small trees are faster to walk than to set up the loop for
+        if self.instructions < MIN_INSTRUCTIONS:
+            return None
+        self.emit(OP_RETURN)
+        return self.chunk
+
+    def emit(self, *codes: int) -> None:
+        self.instructions += 1
+        self.chunk.code.extend(codes)
+
+    def make_constant(self, value: Any) -> int:
+        constants = self.chunk.constants
+        if len(constants) >= MAX_CONSTANTS:
+            raise CompileError("Too many constants in one chunk.")
+        constants.append(value)
+        return len(constants) - 1
+
+    def emit_jump(self, opcode: int) -> int:
+        """Emit jump with a placeholder offset and return the position of the offset"""
+        self.emit(opcode, 0xFF, 0xFF)
+        return len(self.chunk.code) - 2
+
+    def patch_jump(self, offset: int) -> None:
+        code = self.chunk.code
+        jump = len(code) - offset - 2
+        if jump > MAX_JUMP:
+            raise CompileError("Too much code to jump over.")
+        code[offset] = (jump >> 8) & 0xFF
+        code[offset + 1] = jump & 0xFF
+
+    def variable(
+        self, expr: Assign | This | Variable, name: Token, local_op: int, global_op: int
+    ) -> None:
+        local = expr.local
+        if local is not None:
+            self.emit(local_op, self.make_constant(local))
+        else:
+            self.emit(global_op, self.make_constant(name))
+
+    def visit_literal_expr(self, expr: Literal) -> None:
+        self.emit(OP_CONSTANT, self.make_constant(expr.value))
+
+    def visit_grouping_expr(self, expr: Grouping) -> None:
+        expr.expression.accept(self)
+
+    def visit_unary_expr(self, expr: Unary) -> None:
+        expr.right.accept(self)
+        match expr.operator.type:
+            case TokenType.MINUS:
+                self.emit(OP_NEGATE, self.make_constant(expr.operator))
+            case TokenType.BANG:
+                self.emit(OP_NOT)
+            case _:
+                raise CompileError("Unknown unary operator.")
+
+    def visit_binary_expr(self, expr: Binary) -> None:
+        expr.left.accept(self)
+        if expr.operator.type == TokenType.COMMA:
+            # Discard the left operand, value of the expression is the right operand
+            self.emit(OP_POP)
+            expr.right.accept(self)
+            return
+
+        expr.right.accept(self)
+        match expr.operator.type:
+            case TokenType.EQUAL_EQUAL:
+                self.emit(OP_EQUAL)
+            case TokenType.BANG_EQUAL:
+                self.emit(OP_NOT_EQUAL)
+            case _:
+                opcode = BINARY_OPCODES.get(expr.operator.type)
+                if opcode is None:
+                    raise CompileError("Unknown binary operator.")
+                self.emit(opcode, self.make_constant(expr.operator))
+
+    def visit_logical_expr(self, expr: Logical) -> None:
+        expr.left.accept(self)
+        if expr.operator.type == TokenType.OR:
+            else_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+            end_jump = self.emit_jump(OP_JUMP)
+            self.patch_jump(else_jump)
+        else:
+            end_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit(OP_POP)
+        expr.right.accept(self)
+        self.patch_jump(end_jump)
+
+    def visit_conditional_expr(self, expr: Conditional) -> None:
+        expr.condition.accept(self)
+        else_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit(OP_POP)
+        expr.if_true.accept(self)
+        end_jump = self.emit_jump(OP_JUMP)
+        self.patch_jump(else_jump)
+        self.emit(OP_POP)
+        expr.if_false.accept(self)
+        self.patch_jump(end_jump)
+
+    def visit_variable_expr(self, expr: Variable) -> None:
+        self.variable(expr, expr.name, OP_GET_LOCAL, OP_GET_GLOBAL)
+
+    def visit_assign_expr(self, expr: Assign) -> None:
+        expr.value.accept(self)
+        self.variable(expr, expr.name, OP_SET_LOCAL, OP_SET_GLOBAL)
+
+    def visit_call_expr(self, expr: Call) -> None:
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+        self.emit(OP_CALL, self.make_constant((expr.paren, len(expr.arguments))))
+
+    def visit_get_expr(self, expr: Get) -> None:
+        expr.object.accept(self)
+        self.emit(OP_GET_PROPERTY, self.make_constant(expr.name))
+
+    def visit_this_expr(self, expr: This) -> None:
+        self.variable(expr, expr.keyword, OP_GET_LOCAL, OP_GET_GLOBAL)
+
+    # Setting a field checks the object before evaluating the value, so it is simpler to walk
+    def visit_set_expr(self, expr: Set) -> None:
+        self.emit(OP_EVAL, self.make_constant(expr))
+
+    def visit_lambda_expr(self, expr: Lambda) -> None:
+        self.emit(OP_EVAL, self.make_constant(expr))
+
+    def visit_super_expr(self, expr: Super) -> None:
+        self.emit(OP_EVAL, self.make_constant(expr))
@@ -1,51 +1,73 @@
+import sys
 from typing import Any, Optional
 
 import pylox.error as error
 from pylox.scanner import Token
 
+# Marks variables missing from the globals, None is a valid value
+MISSING = object()
+
 
 class Environment:
+    """Local scope, variables are stored in the slots assigned to them by the resolver
+
+    Variables get their slots in the order they are declared in, so defining a variable simply
+    appends it to the values.
+    """
+
     __slots__ = ("values", "enclosing")
 
     def __init__(self, enclosing: Optional["Environment"] = None) -> None:
-        self.values: dict[str, Any] = {}
+        self.values: list[Any] = []
         self.enclosing = enclosing
 
-    def define(self, name: str, value: Any) -> None:
-        self.values[name] = value
+    def define(self, name: str, value: Any) -> None:  # noqa: U100
+        self.values.append(value)
 
     def ancestor(self, distance: int) -> "Environment":
-        environment = self
-        for _ in range(distance):
-            enclosing = environment.enclosing
-            if enclosing is None:
-                raise RuntimeError(
-                    "Corrupted interpreter state, enclosing environemnt was not found"
-                )
-            environment = enclosing
+        # The resolver only gives valid distances, so the chain never runs into None. Most
+        # variables are found within a couple of scopes, which get their own branches.
+        if distance == 0:
+            return self
+        environment: Any = self.enclosing
+        if distance == 1:
+            return environment
+        environment = environment.enclosing
+        if distance == 2:
+            return environment
+        for _ in range(distance - 2):
+            environment = environment.enclosing
         return environment
 
-    def get(self, name: Token) -> Any:
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
+    def get_at(self, distance: int, slot: int) -> Any:
+        return self.ancestor(distance).values[slot]
 
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
+    def assign_at(self, distance: int, slot: int, value: Any) -> None:
+        self.ancestor(distance).values[slot] = value
 
-        raise error.LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
 
-    def get_at(self, distance: int, name: str) -> Any:
-        return self.ancestor(distance).values.get(name)
+class GlobalEnvironment(Environment):
+    """Global scope, variables are looked up by name since they can be declared after use"""
 
-    def assign(self, name: Token, value: Any) -> None:
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
+    __slots__ = ("names",)
 
-        if self.enclosing is not None:
-            return self.enclosing.assign(name, value)
+    def __init__(self) -> None:
+        super().__init__()
+        self.names: dict[str, Any] = {}
+
+    def define(self, name: str, value: Any) -> None:
+        self.names[sys.intern(name)] = value
+
+    def get(self, name: Token) -> Any:
+        value = self.names.get(name.lexeme, MISSING)
+        if value is not MISSING:
+            return value
 
         raise error.LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
 
-    def assign_at(self, distance: int, name: Token, value: Any) -> None:
-        self.ancestor(distance).values[name.lexeme] = value
+    def assign(self, name: Token, value: Any) -> None:
+        if name.lexeme in self.names:
+            self.names[name.lexeme] = value
+            return
+
+        raise error.LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
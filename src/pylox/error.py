@@ -1,5 +1,4 @@
 import sys
-from typing import Any, overload
 
 import pylox.scanner as scanner
 
@@ -20,54 +19,22 @@ class LoxRuntimeError(PyloxError):
         self.token = token
 
 
-class BreakWhileError(PyloxError):
-    """Raised to break out of while loops"""
-
-
-# Inherit from instead of LoxRuntimeError, because this felt more appropriate
-# https://craftinginterpreters.com/functions.html#returning-from-calls
-class ReturnError(PyloxError):
-    """Raised to return from function"""
-
-    __slots__ = ("value",)
-
-    def __init__(self, value: Any) -> None:
-        self.value = value
-
-
-class HadError:
-    had_error = False
-    had_runtime_error = False
+# Error flags, the array is only mutated in place so it can be imported directly
+HAD_ERROR = 0
+HAD_RUNTIME_ERROR = 1
+had_error = bytearray(2)
 
 
 def report(line: int, where: str, message: str) -> None:
     print(f"[line {line}] Error{where}: {message}", file=sys.stderr)
-    HadError.had_error = True
-
-
-@overload
-def error(item: int, message: str) -> None:  # noqa: U100
-    pass
-
-
-@overload
-def error(item: scanner.Token, message: str) -> None:  # noqa: U100
-    pass
-
-
-def error(item: int | scanner.Token, message: str) -> None:
-    if isinstance(item, int):
-        return _error_line(item, message)
-    if isinstance(item, scanner.Token):
-        return _error_token(item, message)
-    raise ValueError(f"unknown item type {type(item)}")
+    had_error[HAD_ERROR] = 1
 
 
-def _error_line(line: int, message: str) -> None:
+def error_line(line: int, message: str) -> None:
     report(line, "", message)
 
 
-def _error_token(token: scanner.Token, message: str) -> None:
+def error_token(token: scanner.Token, message: str) -> None:
     if token.type == scanner.TokenType.EOF:
         report(token.line, " at end", message)
     else:
@@ -76,4 +43,4 @@ def _error_token(token: scanner.Token, message: str) -> None:
 
 def runtime_error(exc: LoxRuntimeError) -> None:
     print(f"{exc}\n[line {exc.token.line}]")
-    HadError.had_runtime_error = True
+    had_error[HAD_RUNTIME_ERROR] = 1
@@ -1,12 +1,15 @@
-from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable, Optional
 
 from pylox import stmt
 from pylox.scanner import Token
 
 
-class Expr(ABC):
-    @abstractmethod
+class Expr:
+    __slots__ = ()
+
+    # Set on each node class by the interpreter, called with it and the node
+    interpret: Callable[[Any, Any], Any]
+
     def accept(self, visitor: "ExprVisitor"):  # noqa: U100
         raise NotImplementedError()
 
@@ -14,12 +17,12 @@ class Expr(ABC):
 class Assign(Expr):
     """Assign expression"""
 
-    __slots___ = ("name", "value")
+    __slots__ = ("name", "value", "local")
 
     def __init__(self, name: Token, value: Expr) -> None:
-        super().__init__()
         self.name = name
         self.value = value
+        self.local: Optional[tuple[int, int]] = None
 
     def accept(self, visitor: "ExprVisitor"):
         return visitor.visit_assign_expr(self)
@@ -28,10 +31,9 @@ class Assign(Expr):
 class Binary(Expr):
     """Binary expression"""
 
-    __slots___ = ("left", "operator", "right")
+    __slots__ = ("left", "operator", "right")
 
     def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
-        super().__init__()
         self.left = left
         self.operator = operator
         self.right = right
@@ -43,10 +45,9 @@ class Binary(Expr):
 class Call(Expr):
     """Call expression"""
 
-    __slots___ = ("callee", "paren", "arguments")
+    __slots__ = ("callee", "paren", "arguments")
 
     def __init__(self, callee: Expr, paren: Token, arguments: list[Expr]) -> None:
-        super().__init__()
         self.callee = callee
         self.paren = paren
         self.arguments = arguments
@@ -58,10 +59,9 @@ class Call(Expr):
 class Get(Expr):
     """Get expression"""
 
-    __slots___ = ("object", "name")
+    __slots__ = ("object", "name")
 
     def __init__(self, object: Expr, name: Token) -> None:
-        super().__init__()
         self.object = object
         self.name = name
 
@@ -72,10 +72,9 @@ class Get(Expr):
 class Grouping(Expr):
     """Grouping expression"""
 
-    __slots___ = ("expression",)
+    __slots__ = ("expression",)
 
     def __init__(self, expression: Expr) -> None:
-        super().__init__()
         self.expression = expression
 
     def accept(self, visitor: "ExprVisitor"):
@@ -85,10 +84,9 @@ class Grouping(Expr):
 class Lambda(Expr):
     """Lambda expression"""
 
-    __slots___ = ("params", "body")
+    __slots__ = ("params", "body")
 
     def __init__(self, params: list[Token], body: list[stmt.Stmt]) -> None:
-        super().__init__()
         self.params = params
         self.body = body
 
@@ -99,10 +97,9 @@ class Lambda(Expr):
 class Literal(Expr):
     """Literal expression"""
 
-    __slots___ = ("value",)
+    __slots__ = ("value",)
 
     def __init__(self, value: Any) -> None:
-        super().__init__()
         self.value = value
 
     def accept(self, visitor: "ExprVisitor"):
@@ -112,10 +109,9 @@ class Literal(Expr):
 class Logical(Expr):
     """Logical expression"""
 
-    __slots___ = ("left", "operator", "right")
+    __slots__ = ("left", "operator", "right")
 
     def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
-        super().__init__()
         self.left = left
         self.operator = operator
         self.right = right
@@ -127,10 +123,9 @@ class Logical(Expr):
 class Set(Expr):
     """Set expression"""
 
-    __slots___ = ("object", "name", "value")
+    __slots__ = ("object", "name", "value")
 
     def __init__(self, object: Expr, name: Token, value: Expr) -> None:
-        super().__init__()
         self.object = object
         self.name = name
         self.value = value
@@ -142,12 +137,12 @@ class Set(Expr):
 class Super(Expr):
     """Super expression"""
 
-    __slots___ = ("keyword", "method")
+    __slots__ = ("keyword", "method", "local")
 
     def __init__(self, keyword: Token, method: Token) -> None:
-        super().__init__()
         self.keyword = keyword
         self.method = method
+        self.local: Optional[tuple[int, int]] = None
 
     def accept(self, visitor: "ExprVisitor"):
         return visitor.visit_super_expr(self)
@@ -156,11 +151,11 @@ class Super(Expr):
 class This(Expr):
     """This expression"""
 
-    __slots___ = ("keyword",)
+    __slots__ = ("keyword", "local")
 
     def __init__(self, keyword: Token) -> None:
-        super().__init__()
         self.keyword = keyword
+        self.local: Optional[tuple[int, int]] = None
 
     def accept(self, visitor: "ExprVisitor"):
         return visitor.visit_this_expr(self)
@@ -169,10 +164,9 @@ class This(Expr):
 class Unary(Expr):
     """Unary expression"""
 
-    __slots___ = ("operator", "right")
+    __slots__ = ("operator", "right")
 
     def __init__(self, operator: Token, right: Expr) -> None:
-        super().__init__()
         self.operator = operator
         self.right = right
 
@@ -183,10 +177,9 @@ class Unary(Expr):
 class Conditional(Expr):
     """Conditional expression"""
 
-    __slots___ = ("condition", "if_true", "if_false")
+    __slots__ = ("condition", "if_true", "if_false")
 
     def __init__(self, condition: Expr, if_true: Expr, if_false: Expr) -> None:
-        super().__init__()
         self.condition = condition
         self.if_true = if_true
         self.if_false = if_false
@@ -198,69 +191,55 @@ class Conditional(Expr):
 class Variable(Expr):
     """Variable expression"""
 
-    __slots___ = ("name",)
+    __slots__ = ("name", "local")
 
     def __init__(self, name: Token) -> None:
-        super().__init__()
         self.name = name
+        self.local: Optional[tuple[int, int]] = None
 
     def accept(self, visitor: "ExprVisitor"):
         return visitor.visit_variable_expr(self)
 
 
-class ExprVisitor(ABC):
-    @abstractmethod
+class ExprVisitor:
     def visit_assign_expr(self, expr: Assign):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_binary_expr(self, expr: Binary):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_call_expr(self, expr: Call):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_get_expr(self, expr: Get):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_grouping_expr(self, expr: Grouping):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_lambda_expr(self, expr: Lambda):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_literal_expr(self, expr: Literal):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_logical_expr(self, expr: Logical):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_set_expr(self, expr: Set):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_super_expr(self, expr: Super):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_this_expr(self, expr: This):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_unary_expr(self, expr: Unary):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_conditional_expr(self, expr: Conditional):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_variable_expr(self, expr: Variable):  # noqa: U100
         raise NotImplementedError()
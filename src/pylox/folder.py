@@ -0,0 +1,195 @@
+from pylox import error
+from pylox.expr import (
+    Assign,
+    Binary,
+    Call,
+    Conditional,
+    Expr,
+    ExprVisitor,
+    Get,
+    Grouping,
+    Lambda,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from pylox.interpreter import Interpreter, is_truthy
+from pylox.scanner import TokenType
+from pylox.stmt import (
+    Block,
+    Break,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    StmtVisitor,
+    Var,
+    While,
+)
+
+
+class ConstantFolder(ExprVisitor, StmtVisitor):
+    """Replaces expressions with only literal operands with their values
+
+    Runs after resolving, so that code dropped here has already been checked. Every visit method
+    returns the node that should take the place of the visited one, statements can also return None
+    to be removed.
+    """
+
+    __slots__ = ("interpreter",)
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        super().__init__()
+        # Used to evaluate the folded expressions so that the results match exactly
+        self.interpreter = interpreter
+
+    def fold(self, statements: list[Stmt]) -> None:
+        statements[:] = [folded for folded in map(self.fold_stmt, statements) if folded is not None]
+
+    def fold_stmt(self, stmt: Stmt) -> Stmt | None:
+        return stmt.accept(self)
+
+    def fold_branch(self, stmt: Stmt) -> Stmt:
+        """Fold statement that can't be removed, like the body of a loop"""
+        folded = self.fold_stmt(stmt)
+        if folded is None:
+            return Block([])
+        return folded
+
+    def fold_expr(self, expr: Expr) -> Expr:
+        return expr.accept(self)
+
+    def evaluate(self, expr: Expr) -> Expr:
+        try:
+            return Literal(self.interpreter.evaluate(expr))
+        except error.LoxRuntimeError:
+            # Leave the error to be reported when the expression is run
+            return expr
+
+    def visit_block_stmt(self, stmt: Block) -> Stmt | None:
+        self.fold(stmt.statements)
+        return stmt
+
+    def visit_break_stmt(self, stmt: Break) -> Stmt | None:
+        return stmt
+
+    def visit_class_stmt(self, stmt: Class) -> Stmt | None:
+        for method in stmt.methods:
+            method.accept(self)
+        return stmt
+
+    def visit_expression_stmt(self, stmt: Expression) -> Stmt | None:
+        stmt.expression = self.fold_expr(stmt.expression)
+        return stmt
+
+    def visit_function_stmt(self, stmt: Function) -> Stmt | None:
+        self.fold(stmt.function.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt: If) -> Stmt | None:
+        stmt.condition = self.fold_expr(stmt.condition)
+        stmt.then_branch = self.fold_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = self.fold_branch(stmt.else_branch)
+        if isinstance(stmt.condition, Literal):
+            # Branches are statements, not declarations, so they don't change the scope
+            return stmt.then_branch if is_truthy(stmt.condition.value) else stmt.else_branch
+        return stmt
+
+    def visit_print_stmt(self, stmt: Print) -> Stmt | None:
+        stmt.expression = self.fold_expr(stmt.expression)
+        return stmt
+
+    def visit_return_stmt(self, stmt: Return) -> Stmt | None:
+        if stmt.value is not None:
+            stmt.value = self.fold_expr(stmt.value)
+        return stmt
+
+    def visit_var_stmt(self, stmt: Var) -> Stmt | None:
+        if stmt.initializer is not None:
+            stmt.initializer = self.fold_expr(stmt.initializer)
+        return stmt
+
+    def visit_while_stmt(self, stmt: While) -> Stmt | None:
+        stmt.condition = self.fold_expr(stmt.condition)
+        stmt.body = self.fold_branch(stmt.body)
+        if isinstance(stmt.condition, Literal) and not is_truthy(stmt.condition.value):
+            return None
+        return stmt
+
+    def visit_assign_expr(self, expr: Assign) -> Expr:
+        expr.value = self.fold_expr(expr.value)
+        return expr
+
+    def visit_binary_expr(self, expr: Binary) -> Expr:
+        expr.left = self.fold_expr(expr.left)
+        expr.right = self.fold_expr(expr.right)
+        if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+            return self.evaluate(expr)
+        return expr
+
+    def visit_call_expr(self, expr: Call) -> Expr:
+        expr.callee = self.fold_expr(expr.callee)
+        expr.arguments = [self.fold_expr(argument) for argument in expr.arguments]
+        return expr
+
+    def visit_conditional_expr(self, expr: Conditional) -> Expr:
+        expr.condition = self.fold_expr(expr.condition)
+        expr.if_true = self.fold_expr(expr.if_true)
+        expr.if_false = self.fold_expr(expr.if_false)
+        if isinstance(expr.condition, Literal):
+            return expr.if_true if is_truthy(expr.condition.value) else expr.if_false
+        return expr
+
+    def visit_get_expr(self, expr: Get) -> Expr:
+        expr.object = self.fold_expr(expr.object)
+        return expr
+
+    def visit_grouping_expr(self, expr: Grouping) -> Expr:
+        expr.expression = self.fold_expr(expr.expression)
+        if isinstance(expr.expression, Literal):
+            return expr.expression
+        return expr
+
+    def visit_lambda_expr(self, expr: Lambda) -> Expr:
+        self.fold(expr.body)
+        return expr
+
+    def visit_literal_expr(self, expr: Literal) -> Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: Logical) -> Expr:
+        expr.left = self.fold_expr(expr.left)
+        expr.right = self.fold_expr(expr.right)
+        if isinstance(expr.left, Literal):
+            if is_truthy(expr.left.value) == (expr.operator.type == TokenType.OR):
+                return expr.left
+            return expr.right
+        return expr
+
+    def visit_set_expr(self, expr: Set) -> Expr:
+        expr.object = self.fold_expr(expr.object)
+        expr.value = self.fold_expr(expr.value)
+        return expr
+
+    def visit_super_expr(self, expr: Super) -> Expr:
+        return expr
+
+    def visit_this_expr(self, expr: This) -> Expr:
+        return expr
+
+    def visit_unary_expr(self, expr: Unary) -> Expr:
+        expr.right = self.fold_expr(expr.right)
+        if isinstance(expr.right, Literal):
+            return self.evaluate(expr)
+        return expr
+
+    def visit_variable_expr(self, expr: Variable) -> Expr:
+        return expr
@@ -1,9 +1,36 @@
 import time
-from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 import pylox.error as error
-from pylox.environment import Environment
+from pylox.compiler import (
+    OP_ADD,
+    OP_CALL,
+    OP_CONSTANT,
+    OP_DIVIDE,
+    OP_EQUAL,
+    OP_EVAL,
+    OP_GET_GLOBAL,
+    OP_GET_LOCAL,
+    OP_GET_PROPERTY,
+    OP_GREATER,
+    OP_GREATER_EQUAL,
+    OP_JUMP,
+    OP_JUMP_IF_FALSE,
+    OP_LESS,
+    OP_LESS_EQUAL,
+    OP_MULTIPLY,
+    OP_NEGATE,
+    OP_NOT,
+    OP_NOT_EQUAL,
+    OP_POP,
+    OP_RETURN,
+    OP_SET_GLOBAL,
+    OP_SET_LOCAL,
+    OP_SUBTRACT,
+    Chunk,
+    Compiler,
+)
+from pylox.environment import MISSING, Environment, GlobalEnvironment
 from pylox.expr import (
     Assign,
     Binary,
@@ -45,14 +72,22 @@ class Unassigned:
 
 UNASSIGNED = Unassigned()
 
+# Token types used at runtime, saves looking the member up from the enum on every use
+TOKEN_OR = TokenType.OR
+
+# Statements return None when they complete, or one of these to unwind to the enclosing loop or
+# call. The value of a return statement is left in Interpreter.return_value.
+BREAK = object()
+RETURN = object()
+
 
-class LoxCallable(ABC):
+# Plain class instead of an ABC, every call checks isinstance against it
+class LoxCallable:
     __slots__ = ("arity",)
 
     def __init__(self, arity: int) -> None:
         self.arity = arity
 
-    @abstractmethod
     def call(self, interpreter: "Interpreter", arguments: list) -> Any:  # noqa: U100
         raise NotImplementedError()
 
@@ -61,6 +96,7 @@ class LoxFunction(LoxCallable):
     __slots__ = ("declaration", "closure", "is_initializer")
 
     def __init__(self, declaration: Function, closure: Environment, is_initializer: bool) -> None:
+        super().__init__(len(declaration.function.params))
         self.declaration = declaration
         self.closure = closure
         self.is_initializer = is_initializer
@@ -68,28 +104,18 @@ class LoxFunction(LoxCallable):
     def __str__(self) -> str:
         return f"<fn {self.declaration.name.lexeme}>"
 
-    @property
-    def arity(self) -> int:
-        return len(self.declaration.function.params)
-
-    @arity.setter
-    def arity(self) -> None:
-        raise NotImplementedError("unreachable")
-
     def call(self, interpreter: "Interpreter", arguments: list) -> Any:
         environment = Environment(self.closure)
-        for param, arg in zip(self.declaration.function.params, arguments):
-            environment.define(param.lexeme, arg)
-
-        try:
-            interpreter.execute_block(self.declaration.function.body, environment)
-        except error.ReturnError as exc:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return exc.value
+        # Parameters take the first slots. The argument list is built for this call only, so it
+        # is used as the values as it is instead of being copied.
+        environment.values = arguments
 
+        status = interpreter.execute_block(self.declaration.function.body, environment)
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            return self.closure.get_at(0, 0)
+        if status is RETURN:
+            return interpreter.return_value
+        return None
 
     def bind(self, instance: "LoxInstance") -> "LoxFunction":
         environement = Environment(self.closure)
@@ -101,29 +127,20 @@ class LoxLambda(LoxCallable):
     __slots__ = ("declaration", "closure")
 
     def __init__(self, declaration: Lambda, closure: Environment) -> None:
+        super().__init__(len(declaration.params))
         self.declaration = declaration
         self.closure = closure
 
     def __str__(self) -> str:
         return "<anonymous fn>"
 
-    @property
-    def arity(self) -> int:
-        return len(self.declaration.params)
-
-    @arity.setter
-    def arity(self) -> None:
-        raise NotImplementedError("unreachable")
-
     def call(self, interpreter: "Interpreter", arguments: list) -> Any:
         environment = Environment(self.closure)
-        for param, arg in zip(self.declaration.params, arguments):
-            environment.define(param.lexeme, arg)
+        environment.values = arguments
 
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except error.ReturnError as exc:
-            return exc.value
+        if interpreter.execute_block(self.declaration.body, environment) is RETURN:
+            return interpreter.return_value
+        return None
 
 
 # Builtin functions
@@ -143,22 +160,17 @@ class LoxClass(LoxCallable):
     ) -> None:
         self.name = name
         self.superclass = superclass
-        self.methods = methods
+        # Inherited methods are copied in, so finding a method never walks the superclasses.
+        # Classes can't change after they are created, so the copies can't go stale.
+        if superclass is not None:
+            methods = superclass.methods | methods
+        self.methods: dict[str, LoxFunction] = methods
+        initializer = self.find_method("init")
+        super().__init__(0 if initializer is None else initializer.arity)
 
     def __str__(self) -> str:
         return self.name
 
-    @property
-    def arity(self) -> int:
-        initialiser = self.find_method("init")
-        if not initialiser:
-            return 0
-        return initialiser.arity
-
-    @arity.setter
-    def arity(self):
-        raise NotImplementedError("unreachable")
-
     def call(self, interpreter: "Interpreter", arguments: list) -> "LoxInstance":  # noqa: U100
         instance = LoxInstance(self)
         initializer = self.find_method("init")
@@ -167,13 +179,7 @@ class LoxClass(LoxCallable):
         return instance
 
     def find_method(self, name: str) -> LoxFunction | None:
-        if name in self.methods:
-            return self.methods[name]
-
-        if self.superclass is not None:
-            return self.superclass.find_method(name)
-
-        return None
+        return self.methods.get(name)
 
 
 class LoxInstance:
@@ -187,8 +193,9 @@ class LoxInstance:
         return f"{self.klass.name} instance"
 
     def get(self, name: Token) -> Any:
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
+        value = self.fields.get(name.lexeme, MISSING)
+        if value is not MISSING:
+            return value
 
         method = self.klass.find_method(name.lexeme)
         if method:
@@ -200,14 +207,24 @@ class LoxInstance:
 
 
 class Interpreter(ExprVisitor, StmtVisitor):
-    __slots__ = ("environment", "is_repl", "globals", "locals")
+    __slots__ = (
+        "environment",
+        "is_repl",
+        "globals",
+        "compiler",
+        "chunks",
+        "return_value",
+    )
 
     def __init__(self) -> None:
         super().__init__()
-        self.globals = Environment()
-        self.locals: dict[Expr, int] = {}
-        self.environment = self.globals
+        self.globals = GlobalEnvironment()
+        self.compiler = Compiler()
+        # None for expressions that are faster to walk
+        self.chunks: dict[Expr, Chunk | None] = {}
+        self.environment: Environment = self.globals
         self.is_repl = False
+        self.return_value: Any = None
 
         # Builtin functions
         self.globals.define("clock", Clock(0))
@@ -217,30 +234,227 @@ class Interpreter(ExprVisitor, StmtVisitor):
             for stmt in statements:
                 self.execute(stmt)
         except error.LoxRuntimeError as exc:
+            # Blocks don't restore their environment when an error unwinds them
+            self.environment = self.globals
             error.runtime_error(exc)
 
-    def execute(self, stmt: Stmt) -> None:
-        stmt.accept(self)
+    def execute(self, stmt: Stmt) -> object | None:
+        return stmt.interpret(self, stmt)
+
+    def execute_block(self, statements: list[Stmt], environment: Environment) -> object | None:
+        """Execute statements in environment and return the status of the one that unwound, if any
 
-    def execute_block(self, statements: list[Stmt], environment: Environment) -> None:
+        The previous environment is not restored if a runtime error is raised from the statements.
+        """
         previous = self.environment
-        try:
-            self.environment = environment
-            for stmt in statements:
-                self.execute(stmt)
-        finally:
-            self.environment = previous
+        self.environment = environment
+        for stmt in statements:
+            status = stmt.interpret(self, stmt)
+            if status is not None:
+                self.environment = previous
+                return status
+        self.environment = previous
+        return None
 
     def evaluate(self, expr: Expr) -> Any:
-        return expr.accept(self)
-
-    def resolve(self, expr: Expr, depth: int) -> None:
-        self.locals[expr] = depth
+        return expr.interpret(self, expr)
 
-    def look_up_variable(self, name: Token, expr: Expr) -> Any:
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
+    def run_expr(self, expr: Expr) -> Any:
+        """Evaluate expression of a statement using the compiled chunk when there is one"""
+        try:
+            chunk = self.chunks[expr]
+        except KeyError:
+            chunk = self.chunks[expr] = self.compiler.compile(expr)
+        if chunk is None:
+            return expr.interpret(self, expr)
+        return self.run_chunk(chunk)
+
+    def run_chunk(self, chunk: Chunk) -> Any:
+        """Run compiled expression and return its value"""
+        code = chunk.code
+        constants = chunk.constants
+        # Calls restore the environment before returning, so it stays the same for the whole chunk
+        environment = self.environment
+        stack: list[Any] = []
+        push = stack.append
+        pop = stack.pop
+        ip = 0
+
+        while True:
+            op = code[ip]
+            # Roughly ordered by how common the instructions are
+            if op == OP_GET_LOCAL:
+                distance, slot = constants[code[ip + 1]]
+                ip += 2
+                push(environment.get_at(distance, slot))
+            elif op == OP_CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+            elif op == OP_GET_GLOBAL:
+                push(self.globals.get(constants[code[ip + 1]]))
+                ip += 2
+            elif op == OP_RETURN:
+                return stack[-1]
+            elif op == OP_CALL:
+                paren, arg_count = constants[code[ip + 1]]
+                ip += 2
+                if arg_count:
+                    arguments = stack[-arg_count:]
+                    del stack[-arg_count:]
+                else:
+                    arguments = []
+                callee = pop()
+                if not isinstance(callee, LoxCallable):
+                    raise error.LoxRuntimeError(paren, "Can only call functions and classes.")
+                if arg_count != callee.arity:
+                    raise error.LoxRuntimeError(
+                        paren, f"Expected {callee.arity} but got {arg_count}."
+                    )
+                push(callee.call(self, arguments))
+            elif op == OP_ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                elif isinstance(left, str) or isinstance(right, str):
+                    stack[-1] = stringify(left) + stringify(right)
+                else:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operands must be two numbers or two strings."
+                    )
+                ip += 2
+            elif op == OP_LESS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operands must be numbers."
+                    )
+                stack[-1] = left < right
+                ip += 2
+            elif op == OP_SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operands must be numbers."
+                    )
+                stack[-1] = left - right
+                ip += 2
+            elif op == OP_JUMP_IF_FALSE:
+                condition = stack[-1]
+                if condition is not None and condition is not False:
+                    ip += 3
+                else:
+                    ip += (code[ip + 1] << 8 | code[ip + 2]) + 3
+            elif op == OP_POP:
+                pop()
+                ip += 1
+            elif op == OP_SET_LOCAL:
+                distance, slot = constants[code[ip + 1]]
+                ip += 2
+                environment.assign_at(distance, slot, stack[-1])
+            elif op == OP_MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operands must be numbers."
+                    )
+                stack[-1] = left * right
+                ip += 2
+            elif op == OP_EQUAL:
+                right = pop()
+                left = stack[-1]
+                stack[-1] = left is right or left == right
+                ip += 1
+            elif op == OP_GET_PROPERTY:
+                obj = pop()
+                name = constants[code[ip + 1]]
+                ip += 2
+                if not isinstance(obj, LoxInstance):
+                    raise error.LoxRuntimeError(name, "Only instances have properties.")
+                value = obj.fields.get(name.lexeme, MISSING)
+                push(obj.get(name) if value is MISSING else value)
+            elif op == OP_SET_GLOBAL:
+                self.globals.assign(constants[code[ip + 1]], stack[-1])
+                ip += 2
+            elif op == OP_JUMP:
+                ip += (code[ip + 1] << 8 | code[ip + 2]) + 3
+            elif op == OP_GREATER:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operands must be numbers."
+                    )
+                stack[-1] = left > right
+                ip += 2
+            elif op == OP_GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operands must be numbers."
+                    )
+                stack[-1] = left >= right
+                ip += 2
+            elif op == OP_LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operands must be numbers."
+                    )
+                stack[-1] = left <= right
+                ip += 2
+            elif op == OP_DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operands must be numbers."
+                    )
+                try:
+                    stack[-1] = left / right
+                except ZeroDivisionError:
+                    raise error.LoxRuntimeError(constants[code[ip + 1]], "Cannot divide by zero.")
+                ip += 2
+            elif op == OP_NOT_EQUAL:
+                right = pop()
+                left = stack[-1]
+                stack[-1] = left is not right and left != right
+                ip += 1
+            elif op == OP_NOT:
+                stack[-1] = stack[-1] is None or stack[-1] is False
+                ip += 1
+            elif op == OP_NEGATE:
+                right = stack[-1]
+                if type(right) is not float:
+                    raise error.LoxRuntimeError(
+                        constants[code[ip + 1]], "Operand must be a number."
+                    )
+                stack[-1] = -right
+                ip += 2
+            elif op == OP_EVAL:
+                push(self.evaluate(constants[code[ip + 1]]))
+                ip += 2
+            else:
+                raise NotImplementedError("unreachable")
+
+    def resolve(self, expr: Assign | Super | This | Variable, depth: int, slot: int) -> None:
+        # Stored on the node, globals are left as None
+        expr.local = (depth, slot)
+
+    def resolve_scopeless(self, block: Block) -> None:
+        # Block without declarations, run without creating an environment. Stored on the node like
+        # the variable slots.
+        block.scopeless = True
+
+    def look_up_variable(self, name: Token, expr: This | Variable) -> Any:
+        local = expr.local
+        if local is not None:
+            return self.environment.get_at(*local)
         return self.globals.get(name)
 
     def visit_literal_expr(self, expr: Literal) -> Any:
@@ -251,68 +465,16 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visit_unary_expr(self, expr: Unary) -> float | bool:
         right = self.evaluate(expr.right)
-
-        match expr.operator.type:
-            case TokenType.MINUS:
-                check_number_operand(expr.operator, right)
-                return -float(right)
-            case TokenType.BANG:
-                return not is_truthy(right)
-
-        raise NotImplementedError("unreachable")
+        return UNARY_OPERATORS[expr.operator.type](expr.operator, right)
 
     def visit_binary_expr(self, expr: Binary) -> float | str | bool:
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
-
-        match expr.operator.type:
-            case TokenType.GREATER:
-                check_number_operand2(expr.operator, left, right)
-                return float(left) > float(right)
-            case TokenType.GREATER_EQUAL:
-                check_number_operand2(expr.operator, left, right)
-                return float(left) >= float(right)
-            case TokenType.LESS:
-                check_number_operand2(expr.operator, left, right)
-                return float(left) < float(right)
-            case TokenType.LESS_EQUAL:
-                check_number_operand2(expr.operator, left, right)
-                return float(left) <= float(right)
-            case TokenType.PLUS:
-                if isinstance(left, float) and isinstance(right, float):
-                    return float(left) + float(right)
-                if isinstance(left, str) or isinstance(right, str):
-                    return stringify(left) + stringify(right)
-                raise error.LoxRuntimeError(
-                    expr.operator, "Operands must be two numbers or two strings."
-                )
-            case TokenType.MINUS:
-                check_number_operand2(expr.operator, left, right)
-                return float(left) - float(right)
-            case TokenType.SLASH:
-                check_number_operand2(expr.operator, left, right)
-                try:
-                    return float(left) / float(right)
-                except ZeroDivisionError:
-                    raise error.LoxRuntimeError(expr.operator, "Cannot divide by zero.")
-            case TokenType.STAR:
-                check_number_operand2(expr.operator, left, right)
-                return float(left) * float(right)
-            case TokenType.BANG_EQUAL:
-                return not is_equal(left, right)
-            case TokenType.EQUAL_EQUAL:
-                return is_equal(left, right)
-            case TokenType.COMMA:
-                # From Wikipedia https://en.wikipedia.org/wiki/Comma_operator:
-                # ... the comma operator is a binary operator that evaluates its first operand and
-                # discards the result, and then evaluates the second operand and returns this value
-                return right
-
-        raise NotImplementedError("unreachable")
+        return BINARY_OPERATORS[expr.operator.type](expr.operator, left, right)
 
     def visit_conditional_expr(self, expr: Conditional) -> Any:
         condition = self.evaluate(expr.condition)
-        if is_truthy(condition):
+        if condition is not None and condition is not False:
             return self.evaluate(expr.if_true)
         return self.evaluate(expr.if_false)
 
@@ -321,9 +483,9 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visit_assign_expr(self, expr: Assign) -> Any:
         value = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
+        local = expr.local
+        if local is not None:
+            self.environment.assign_at(*local, value)
         else:
             self.globals.assign(expr.name, value)
         return value
@@ -331,11 +493,11 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def visit_logical_expr(self, expr: Logical) -> Any:
         left = self.evaluate(expr.left)
 
-        if expr.operator.type == TokenType.OR:
-            if is_truthy(left):
+        if expr.operator.type is TOKEN_OR:
+            if left is not None and left is not False:
                 return left
         else:
-            if not is_truthy(left):
+            if left is None or left is False:
                 return left
 
         return self.evaluate(expr.right)
@@ -354,6 +516,10 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def visit_get_expr(self, expr: Get) -> Any:
         obj = self.evaluate(expr.object)
         if isinstance(obj, LoxInstance):
+            # Fields are checked here first, only methods need the call
+            value = obj.fields.get(expr.name.lexeme, MISSING)
+            if value is not MISSING:
+                return value
             return obj.get(expr.name)
         raise error.LoxRuntimeError(expr.name, "Only instances have properties.")
 
@@ -366,10 +532,12 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return value
 
     def visit_super_expr(self, expr: Super) -> Any:
-        distance = self.locals[expr]
-        superclass: LoxClass = self.environment.get_at(distance, "super")
+        # Super is always resolved, the class that uses it is never global
+        distance, slot = expr.local  # type: ignore[misc]
+        superclass: LoxClass = self.environment.get_at(distance, slot)
         # object is python builtin
-        instance: LoxInstance = self.environment.get_at(distance - 1, "this")
+        # "this" is always the only variable in the scope just inside the one with "super"
+        instance: LoxInstance = self.environment.get_at(distance - 1, 0)
         method = superclass.find_method(expr.method.lexeme)
         if method is None:
             raise error.LoxRuntimeError(expr.method, f"Undefined property '{expr.method.lexeme}'.")
@@ -383,35 +551,39 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return LoxLambda(expr, self.environment)
 
     def visit_expression_stmt(self, stmt: Expression) -> None:
-        value = self.evaluate(stmt.expression)
+        value = self.run_expr(stmt.expression)
         # Chapter 8 challenge 1
         if self.is_repl:
             print(stringify(value))
 
     def visit_print_stmt(self, stmt: Print) -> None:
-        value = self.evaluate(stmt.expression)
+        value = self.run_expr(stmt.expression)
         print(stringify(value))
 
     def visit_var_stmt(self, stmt: Var) -> None:
         value = UNASSIGNED
         if stmt.initializer is not None:
-            value = self.evaluate(stmt.initializer)
+            value = self.run_expr(stmt.initializer)
         self.environment.define(stmt.name.lexeme, value)
 
-    def visit_block_stmt(self, stmt: Block) -> None:
-        self.execute_block(stmt.statements, Environment(self.environment))
+    def visit_block_stmt(self, stmt: Block) -> object | None:
+        if stmt.scopeless:
+            for inner in stmt.statements:
+                status = inner.interpret(self, inner)
+                if status is not None:
+                    return status
+            return None
+        return self.execute_block(stmt.statements, Environment(self.environment))
 
     def visit_class_stmt(self, stmt: Class) -> None:
         # Hack to acchieve the same shadowing of class properties that Java has
-        class_environment = self.environment
+        class_environment: Environment = self.environment
         superclass = None
         if stmt.superclass is not None:
             superclass = self.evaluate(stmt.superclass)
             if not isinstance(superclass, LoxClass):
                 raise error.LoxRuntimeError(stmt.superclass.name, "Superclass must be a class.")
 
-        class_environment.define(stmt.name.lexeme, None)
-
         if stmt.superclass is not None:
             class_environment = Environment(class_environment)
             class_environment.define("super", superclass)
@@ -423,76 +595,194 @@ class Interpreter(ExprVisitor, StmtVisitor):
             )
 
         lox_class = LoxClass(stmt.name.lexeme, superclass, methods)
+        # Nothing can run while the class is being created, so the class can be defined last
+        self.environment.define(stmt.name.lexeme, lox_class)
+
+    def visit_if_stmt(self, stmt: If) -> object | None:
+        condition = self.run_expr(stmt.condition)
+        if condition is not None and condition is not False:
+            return self.execute(stmt.then_branch)
+        if stmt.else_branch is not None:
+            return self.execute(stmt.else_branch)
+        return None
 
-        if stmt.superclass is not None:
-            class_environment = class_environment.enclosing
-
-        class_environment.assign(stmt.name, lox_class)
-
-    def visit_if_stmt(self, stmt: If) -> None:
-        if is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
-        elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
-
-    def visit_while_stmt(self, stmt: While) -> None:
-        while is_truthy(self.evaluate(stmt.condition)):
-            try:
-                self.execute(stmt.body)
-            except error.BreakWhileError:
-                break
+    def visit_while_stmt(self, stmt: While) -> object | None:
+        body = stmt.body
+        while (condition := self.run_expr(stmt.condition)) is not None and condition is not False:
+            status = body.interpret(self, body)
+            if status is not None:
+                # Break stops here, return unwinds further to the call
+                return None if status is BREAK else status
+        return None
 
-    def visit_break_stmt(self, _stmt: Break) -> None:  # noqa: U101
-        raise error.BreakWhileError()
+    def visit_break_stmt(self, _stmt: Break) -> object:  # noqa: U101
+        return BREAK
 
     def visit_function_stmt(self, stmt: Function) -> None:
         func = LoxFunction(stmt, self.environment, False)
         self.environment.define(stmt.name.lexeme, func)
 
-    def visit_return_stmt(self, stmt: Return) -> None:
+    def visit_return_stmt(self, stmt: Return) -> object:
         value = None
         if stmt.value is not None:
-            value = self.evaluate(stmt.value)
-        raise error.ReturnError(value)
+            value = self.run_expr(stmt.value)
+        self.return_value = value
+        return RETURN
 
 
 def is_truthy(value: Any) -> bool:
     """false and nill are falsey, everything else is truthy"""
-    if value is None:
-        return False
-    if isinstance(value, bool):
-        return bool(value)
-    return True
+    # Both are singletons, so identity checks are enough. The interpreter inlines this check in
+    # the hot paths, keep them in sync.
+    return value is not None and value is not False
 
 
-def is_equal(a: Any, b: Any) -> bool:
-    # None is only equal to None
-    return a == b
+def stringify(value: Any) -> str:
+    if value is None:
+        return "nil"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+
+    if type(value) is float:
+        # Whole numbers are printed without the trailing ".0", large ones keep the exponent
+        # notation of repr. Zero goes through repr to keep the sign of -0.
+        if value.is_integer() and -1e16 < value < 1e16:
+            return "%d" % value if value else repr(value)[:-2]
+        return repr(value)
+
+    return str(value)
 
 
-def check_number_operand(operator: Token, operand: Any) -> None:
-    if isinstance(operand, float):
-        return
+# Operator implementations, called with the operator token for error reporting. Numbers are always
+# exactly float, so the operands are checked with type instead of isinstance. Python operators can't
+# do the checking, since bool is an int and strings can be compared.
+def negate(operator: Token, right: Any) -> float:
+    if type(right) is float:
+        return -right
     raise error.LoxRuntimeError(operator, "Operand must be a number.")
 
 
-def check_number_operand2(operator: Token, left: Any, right: Any) -> None:
-    if isinstance(left, float) and isinstance(right, float):
-        return
+def logical_not(_operator: Token, right: Any) -> bool:  # noqa: U101
+    return right is None or right is False
+
+
+def greater(operator: Token, left: Any, right: Any) -> bool:
+    if type(left) is float and type(right) is float:
+        return left > right
     raise error.LoxRuntimeError(operator, "Operands must be numbers.")
 
 
-def stringify(value: Any) -> str:
-    if value is None:
-        return "nil"
+def greater_equal(operator: Token, left: Any, right: Any) -> bool:
+    if type(left) is float and type(right) is float:
+        return left >= right
+    raise error.LoxRuntimeError(operator, "Operands must be numbers.")
 
-    if isinstance(value, float):
-        text = str(value)
-        if text.endswith(".0"):
-            text = text[:-2]
-        return text
 
-    if isinstance(value, bool):
-        return str(value).lower()
+def less(operator: Token, left: Any, right: Any) -> bool:
+    if type(left) is float and type(right) is float:
+        return left < right
+    raise error.LoxRuntimeError(operator, "Operands must be numbers.")
 
-    return str(value)
+
+def less_equal(operator: Token, left: Any, right: Any) -> bool:
+    if type(left) is float and type(right) is float:
+        return left <= right
+    raise error.LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def add(operator: Token, left: Any, right: Any) -> float | str:
+    if type(left) is float and type(right) is float:
+        return left + right
+    if isinstance(left, str) or isinstance(right, str):
+        return stringify(left) + stringify(right)
+    raise error.LoxRuntimeError(operator, "Operands must be two numbers or two strings.")
+
+
+def subtract(operator: Token, left: Any, right: Any) -> float:
+    if type(left) is float and type(right) is float:
+        return left - right
+    raise error.LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def divide(operator: Token, left: Any, right: Any) -> float:
+    if type(left) is not float or type(right) is not float:
+        raise error.LoxRuntimeError(operator, "Operands must be numbers.")
+    try:
+        return left / right
+    except ZeroDivisionError:
+        raise error.LoxRuntimeError(operator, "Cannot divide by zero.")
+
+
+def multiply(operator: Token, left: Any, right: Any) -> float:
+    if type(left) is float and type(right) is float:
+        return left * right
+    raise error.LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def not_equal(_operator: Token, left: Any, right: Any) -> bool:  # noqa: U101
+    return left is not right and left != right
+
+
+def equal(_operator: Token, left: Any, right: Any) -> bool:  # noqa: U101
+    # Identity check is a shortcut for singletons and interned strings, and makes nil equal to nil
+    return left is right or left == right
+
+
+def comma(_operator: Token, _left: Any, right: Any) -> Any:  # noqa: U101
+    # From Wikipedia https://en.wikipedia.org/wiki/Comma_operator:
+    # ... the comma operator is a binary operator that evaluates its first operand and
+    # discards the result, and then evaluates the second operand and returns this value
+    return right
+
+
+UNARY_OPERATORS: dict[TokenType, Callable[[Token, Any], Any]] = {
+    TokenType.MINUS: negate,
+    TokenType.BANG: logical_not,
+}
+
+BINARY_OPERATORS: dict[TokenType, Callable[[Token, Any, Any], Any]] = {
+    TokenType.GREATER: greater,
+    TokenType.GREATER_EQUAL: greater_equal,
+    TokenType.LESS: less,
+    TokenType.LESS_EQUAL: less_equal,
+    TokenType.PLUS: add,
+    TokenType.MINUS: subtract,
+    TokenType.SLASH: divide,
+    TokenType.STAR: multiply,
+    TokenType.BANG_EQUAL: not_equal,
+    TokenType.EQUAL_EQUAL: equal,
+    TokenType.COMMA: comma,
+}
+
+
+# Nodes are dispatched through the visit methods stored on their classes, which skips both the call
+# to accept and looking the method up by the node type
+for node_type, visit in (
+    (Assign, Interpreter.visit_assign_expr),
+    (Binary, Interpreter.visit_binary_expr),
+    (Call, Interpreter.visit_call_expr),
+    (Conditional, Interpreter.visit_conditional_expr),
+    (Get, Interpreter.visit_get_expr),
+    (Grouping, Interpreter.visit_grouping_expr),
+    (Lambda, Interpreter.visit_lambda_expr),
+    (Literal, Interpreter.visit_literal_expr),
+    (Logical, Interpreter.visit_logical_expr),
+    (Set, Interpreter.visit_set_expr),
+    (Super, Interpreter.visit_super_expr),
+    (This, Interpreter.visit_this_expr),
+    (Unary, Interpreter.visit_unary_expr),
+    (Variable, Interpreter.visit_variable_expr),
+    (Block, Interpreter.visit_block_stmt),
+    (Break, Interpreter.visit_break_stmt),
+    (Class, Interpreter.visit_class_stmt),
+    (Expression, Interpreter.visit_expression_stmt),
+    (Function, Interpreter.visit_function_stmt),
+    (If, Interpreter.visit_if_stmt),
+    (Print, Interpreter.visit_print_stmt),
+    (Return, Interpreter.visit_return_stmt),
+    (Var, Interpreter.visit_var_stmt),
+    (While, Interpreter.visit_while_stmt),
+):
+    node_type.interpret = staticmethod(visit)
@@ -1,26 +1,52 @@
-from pylox.error import HadError
+from pylox.error import HAD_ERROR, had_error
+from pylox.folder import ConstantFolder
 from pylox.interpreter import Interpreter
 from pylox.parser import Parser
 from pylox.resolver import Resolver
 from pylox.scanner import Scanner
+from pylox.stmt import Stmt
 
 INTERPRETER = Interpreter()
 
+# Resolved programs by their source, running the same source again skips straight to interpreting.
+# Only programs without errors are stored, so there is nothing to report for them again. The most
+# recently run programs are kept, so that a long REPL session doesn't keep every line it has seen.
+PROGRAMS: dict[str, list[Stmt]] = {}
+MAX_PROGRAMS = 64
+
 
 def run(source: str) -> None:
+    # Taken out and put back in, dictionaries keep the least recently run program first
+    statements = PROGRAMS.pop(source, None)
+    if statements is None:
+        statements = prepare(source)
+        if statements is None:
+            return
+        if len(PROGRAMS) >= MAX_PROGRAMS:
+            del PROGRAMS[next(iter(PROGRAMS))]
+            # Compiled chunks are keyed by the nodes, the dropped tree is freed only when they go.
+            # Chunks of the remaining programs are compiled again when needed.
+            INTERPRETER.chunks.clear()
+    PROGRAMS[source] = statements
+
+    INTERPRETER.interpret(statements)
+
+
+def prepare(source: str) -> list[Stmt] | None:
     scanner = Scanner(source)
     tokens = scanner.scan_tokens()
     parser = Parser(tokens)
     statements = parser.parse()
 
     # Stop of there was a syntax error
-    if HadError.had_error:
-        return
+    if had_error[HAD_ERROR]:
+        return None
 
     # Stop if there was a resolution error.
     resolver = Resolver(INTERPRETER)
     resolver.resolve(statements)
-    if HadError.had_error:
-        return
+    if had_error[HAD_ERROR]:
+        return None
 
-    INTERPRETER.interpret(statements)
+    ConstantFolder(INTERPRETER).fold(statements)
+    return statements
@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pylox.version
 
-from .error import HadError
+from .error import HAD_ERROR, HAD_RUNTIME_ERROR, had_error
 from .lox import INTERPRETER, run
 
 type path_like = str | bytes | os.PathLike
@@ -16,9 +16,9 @@ def run_file(path: path_like):
         source = fs.read()
 
     run(source)
-    if HadError.had_error:
+    if had_error[HAD_ERROR]:
         sys.exit(65)
-    if HadError.had_runtime_error:
+    if had_error[HAD_RUNTIME_ERROR]:
         sys.exit(70)
 
 
@@ -37,7 +37,7 @@ def run_prompt():
             break
 
         run(line)
-        HadError.had_error = False
+        had_error[HAD_ERROR] = 0
 
 
 def parse_input(s: str) -> Path | None:
@@ -34,13 +34,38 @@ from pylox.stmt import (
     While,
 )
 
-
-class InvalidDeclatation(Stmt):
-    """Statement returned on invalid variable declaration statement"""
-
-    def accept(self, _visitor: Any) -> None:  # noqa: U101
-        # This should never be visited
-        raise RuntimeError("cannot visit invalid declaration statement")
+UNARY_OPERATORS = frozenset((TokenType.BANG, TokenType.MINUS))
+
+# Binary operators that can't start an expression, reported as a missing left-hand operand
+BINARY_ONLY_OPERATORS = frozenset(
+    (
+        TokenType.BANG_EQUAL,
+        TokenType.EQUAL_EQUAL,
+        TokenType.GREATER,
+        TokenType.GREATER_EQUAL,
+        TokenType.LESS,
+        TokenType.LESS_EQUAL,
+        TokenType.PLUS,
+        TokenType.SLASH,
+        TokenType.STAR,
+    )
+)
+# Tokens that end the statements of a block
+BLOCK_END = frozenset((TokenType.RIGHT_BRACE, TokenType.EOF))
+
+# Tokens that start a statement, parsing resumes at them after an error
+SYNCHRONIZE_TOKENS = frozenset(
+    (
+        TokenType.CLASS,
+        TokenType.FUN,
+        TokenType.VAR,
+        TokenType.FOR,
+        TokenType.IF,
+        TokenType.WHILE,
+        TokenType.PRINT,
+        TokenType.RETURN,
+    )
+)
 
 
 class FunctionKind(enum.StrEnum):
@@ -53,14 +78,18 @@ def lasbo(
     getter: Callable[["Parser"], Expr], *types: TokenType
 ) -> Callable[[Any], Callable[["Parser"], Expr]]:
     """Generate code for parsing a Left-Associative Series of Binary Operators"""
+    # Operators are tested with a single set lookup instead of matching each type in turn
+    operators = frozenset(types)
 
     def decorator(_func: Callable[["Parser"], Expr]) -> Callable[["Parser"], Expr]:  # noqa: U101
 
         def inner(self: "Parser") -> Expr:
             expr = getter(self)
+            tokens = self.tokens
 
-            while self.match(*types):
-                operator = self.previous()
+            # EOF is never an operator, so the end doesn't need a separate check
+            while (operator := tokens[self.current]).type in operators:
+                self.current += 1
                 right = getter(self)
                 expr = Binary(expr, operator, right)
 
@@ -127,46 +156,54 @@ class Parser:
 
     def __init__(self, tokens: list[Token]) -> None:
         self.tokens = tokens
+        self.n_tokens = len(tokens)
         self.current = 0
         self.loop_depth = 0
+        # Literal nodes are never modified, so every constant gets only one node. Keyed by the type
+        # as well, because True == 1.0
+        self.literals: dict[tuple[type, Any], Literal] = {}
 
     def parse(self) -> list[Stmt]:
-        statements = []
-        while not self.is_at_end():
-            statements.append(self.declaration())
+        statements: list[Stmt] = []
+        # Bound methods are looked up once instead of on every statement
+        append = statements.append
+        declaration = self.declaration
+        is_at_end = self.is_at_end
+        while not is_at_end():
+            # Declarations that failed to parse are left out
+            if (stmt := declaration()) is not None:
+                append(stmt)
         return statements
 
-    def match(self, *types: TokenType) -> bool:
-        """
-        Check if current token is any of the tokens. Consume it if True and return equality result
-        """
-        for t in types:
-            if self.check(t):
-                self.advance()
-                return True
+    def match(self, t: TokenType) -> bool:
+        """Check if current token is of type t. Consume it if True and return equality result"""
+        # Same as check and advance, inlined since this runs for most grammar decisions. EOF is
+        # never matched, so the current token can't be moved past it.
+        if self.tokens[self.current].type is t:
+            self.current += 1
+            return True
 
         return False
 
     def check(self, t: TokenType) -> bool:
         """Check if current token is of type t"""
-        if self.is_at_end():
-            return False
-        return self.peek().type == t
+        # Never called with EOF, so the end of tokens doesn't need its own check
+        return self.tokens[self.current].type is t
 
     def check2(self, t: TokenType, extra: int) -> bool:
         position = self.current + extra
-        if not position < len(self.tokens):
-            return False
-        return self.tokens[position].type == t
+        return position < self.n_tokens and self.tokens[position].type is t
 
     def is_at_end(self) -> bool:
-        return self.peek().type == TokenType.EOF
+        return self.tokens[self.current].type is TokenType.EOF
 
     def advance(self) -> Token:
         """Consume current token"""
-        if not self.is_at_end():
-            self.current += 1
-        return self.previous()
+        token = self.tokens[self.current]
+        if token.type is TokenType.EOF:
+            return self.tokens[self.current - 1]
+        self.current += 1
+        return token
 
     def previous(self) -> Token:
         return self.tokens[self.current - 1]
@@ -181,28 +218,24 @@ class Parser:
             if self.previous().type == TokenType.SEMICOLON:
                 return
 
-            match self.peek().type:
-                case (
-                    TokenType.CLASS
-                    | TokenType.FUN
-                    | TokenType.VAR
-                    | TokenType.FOR
-                    | TokenType.IF
-                    | TokenType.WHILE
-                    | TokenType.PRINT
-                    | TokenType.RETURN
-                ):
-                    return
+            if self.peek().type in SYNCHRONIZE_TOKENS:
+                return
 
             self.advance()
 
     def error(self, token: Token, message: str) -> error.ParseError:
-        error.error(token, message)
+        error.error_token(token, message)
         return error.ParseError()
 
-    def consume(self, t: TokenType, message: str) -> Token:
+    def consume(self, t: TokenType, message: str | Callable[[], str]) -> Token:
+        """
+        Consume token of type t or report the error. Message can be a function, to only format it on
+        error
+        """
         if self.check(t):
             return self.advance()
+        if not isinstance(message, str):
+            message = message()
         raise self.error(self.peek(), message)
 
     def expression(self) -> Expr:
@@ -223,59 +256,47 @@ class Parser:
 
         return expr
 
-    def primary(self) -> Expr:
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-
-        if self.match(TokenType.TRUE):
-            return Literal(True)
-
-        if self.match(TokenType.NIL):
-            return Literal(None)
-
-        if self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
-
-        if self.match(TokenType.SUPER):
-            keyword = self.previous()
-            self.consume(TokenType.DOT, "Expect '.' after 'super'.")
-            method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
-            return Super(keyword, method)
-
-        if self.match(TokenType.THIS):
-            return This(self.previous())
-
-        if self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
+    def literal(self, value: Any) -> Literal:
+        key = (type(value), value)
+        expr = self.literals.get(key)
+        if expr is None:
+            expr = self.literals[key] = Literal(value)
+        return expr
 
-        if self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
+    def primary(self) -> Expr:
+        # The rule is picked with a single lookup instead of matching each starting token in turn
+        token = self.tokens[self.current]
+        rule = PRIMARY_RULES.get(token.type)
+        if rule is not None:
+            self.current += 1
+            return rule(self)
 
         # Chapter 6 challenge 3
         # Missing left hand expression in binary operator
-        if self.match(
-            TokenType.BANG_EQUAL,
-            TokenType.EQUAL_EQUAL,
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-            TokenType.PLUS,
-            TokenType.SLASH,
-            TokenType.STAR,
-        ):
+        if token.type in BINARY_ONLY_OPERATORS:
+            self.advance()
             # Raising an error, unlike the example, since returning None from here causes a lot of
             # problems with type checking
             # https://github.com/munificent/craftinginterpreters/blob/master/note/answers/chapter06_parsing.md
-            raise self.error(self.previous(), "Missing left-hand operand.")
+            raise self.error(token, "Missing left-hand operand.")
 
-        raise self.error(self.peek(), "Expected expression.")
+        raise self.error(token, "Expected expression.")
+
+    def super_expression(self) -> Super:
+        keyword = self.previous()
+        self.consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        return Super(keyword, method)
+
+    def grouping(self) -> Grouping:
+        expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expr)
 
     def finish_call(self, callee: Expr) -> Call:
         arguments: list[Expr] = []
-        if not self.check(TokenType.RIGHT_PAREN):
+        tokens = self.tokens
+        if tokens[self.current].type is not TokenType.RIGHT_PAREN:
             while True:
                 if len(arguments) >= 255:
                     self.error(self.peek(), "Can't have more than 255 arguments.")
@@ -283,18 +304,26 @@ class Parser:
                 # https://github.com/munificent/craftinginterpreters/issues/263#issuecomment-412353276
                 arguments.append(self.equality())
 
-                if not self.match(TokenType.COMMA):
+                # Separators are read directly like in call, which runs this for every '('
+                if tokens[self.current].type is not TokenType.COMMA:
                     break
+                self.current += 1
         paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
         return Call(callee, paren, arguments)
 
     def call(self) -> Expr:
         expr = self.primary()
+        tokens = self.tokens
 
+        # Runs after every primary expression, so the token is read once and consumed in place
+        # instead of matching each type in turn
         while True:
-            if self.match(TokenType.LEFT_PAREN):
+            token_type = tokens[self.current].type
+            if token_type is TokenType.LEFT_PAREN:
+                self.current += 1
                 expr = self.finish_call(expr)
-            elif self.match(TokenType.DOT):
+            elif token_type is TokenType.DOT:
+                self.current += 1
                 name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
                 expr = Get(expr, name)
             else:
@@ -303,13 +332,21 @@ class Parser:
         return expr
 
     def unary(self) -> Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        if self.match(TokenType.FUN):
-            return self.lambda_expression()
-        return self.call()
+        if self.tokens[self.current].type not in UNARY_OPERATORS:
+            if self.match(TokenType.FUN):
+                return self.lambda_expression()
+            return self.call()
+
+        # Prefix operators are collected in a loop and applied innermost first, instead of
+        # recursing once per operator
+        operators: list[Token] = []
+        while self.tokens[self.current].type in UNARY_OPERATORS:
+            operators.append(self.advance())
+
+        expr = self.unary()
+        for operator in reversed(operators):
+            expr = Unary(operator, expr)
+        return expr
 
     @lasbo(unary, TokenType.STAR, TokenType.SLASH)
     def factor(self):
@@ -397,7 +434,7 @@ class Parser:
             body = Block([body, Expression(increment)])
 
         if condition is None:
-            condition = Literal(True)
+            condition = self.literal(True)
         body = While(condition, body)
 
         if initializer is not None:
@@ -433,18 +470,21 @@ class Parser:
         self.consume(TokenType.SEMICOLON, "Expect ';' after expression.")
         return Expression(expr)
 
-    def declaration(self) -> Stmt:
+    def declaration(self) -> Stmt | None:
+        """Parse declaration, or report the error and return None if it's invalid"""
         try:
             if self.match(TokenType.CLASS):
                 return self.class_declaration()
-            if self.check2(TokenType.IDENTIFIER, 1) and self.match(TokenType.FUN):
+            # Only look ahead when the declaration starts with 'fun', most of them don't
+            if self.check(TokenType.FUN) and self.check2(TokenType.IDENTIFIER, 1):
+                self.current += 1
                 return self.function(FunctionKind.FUNCTION)
             if self.match(TokenType.VAR):
                 return self.var_declaration()
             return self.statement()
         except error.ParseError:
             self.synchronize()
-            return InvalidDeclatation()
+            return None
 
     def class_declaration(self) -> Class:
         name = self.consume(TokenType.IDENTIFIER, "Expect class name.")
@@ -464,7 +504,7 @@ class Parser:
         return Class(name, superclass, methods)
 
     def function(self, kind: FunctionKind) -> Function:
-        name = self.consume(TokenType.IDENTIFIER, f"Expect {kind} name.")
+        name = self.consume(TokenType.IDENTIFIER, lambda: f"Expect {kind} name.")
         return Function(name, self.lambda_expression(kind))
 
     def var_declaration(self) -> Var:
@@ -478,10 +518,14 @@ class Parser:
         return Var(name, initializer)
 
     def block(self) -> list[Stmt]:
-        statements = []
+        statements: list[Stmt] = []
+        append = statements.append
+        declaration = self.declaration
+        tokens = self.tokens
 
-        while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
-            statements.append(self.declaration())
+        while tokens[self.current].type not in BLOCK_END:
+            if (stmt := declaration()) is not None:
+                append(stmt)
 
         self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
         return statements
@@ -518,10 +562,10 @@ class Parser:
         return expr
 
     def lambda_expression(self, kind: FunctionKind = FunctionKind.LAMBDA) -> Lambda:
-        if kind == FunctionKind.LAMBDA:
+        if kind is FunctionKind.LAMBDA:
             self.consume(TokenType.LEFT_PAREN, "Expect '(' after lambda expression.")
         else:
-            self.consume(TokenType.LEFT_PAREN, f"Expect '(' after {kind} name.")
+            self.consume(TokenType.LEFT_PAREN, lambda: f"Expect '(' after {kind} name.")
 
         parameters: list[Token] = []
         if not self.check(TokenType.RIGHT_PAREN):
@@ -533,6 +577,26 @@ class Parser:
                     break
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
 
-        self.consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.")
-        body = self.block()
+        self.consume(TokenType.LEFT_BRACE, lambda: f"Expect '{{' before {kind} body.")
+        # Loops around the function don't continue into its body, 'break' can't leave a call
+        loop_depth = self.loop_depth
+        self.loop_depth = 0
+        try:
+            body = self.block()
+        finally:
+            self.loop_depth = loop_depth
         return Lambda(parameters, body)
+
+
+# Rules for the tokens that start a primary expression, called after the token is consumed
+PRIMARY_RULES: dict[TokenType, Callable[[Parser], Expr]] = {
+    TokenType.FALSE: lambda parser: parser.literal(False),
+    TokenType.TRUE: lambda parser: parser.literal(True),
+    TokenType.NIL: lambda parser: parser.literal(None),
+    TokenType.NUMBER: lambda parser: parser.literal(parser.previous().literal),
+    TokenType.STRING: lambda parser: parser.literal(parser.previous().literal),
+    TokenType.SUPER: Parser.super_expression,
+    TokenType.THIS: lambda parser: This(parser.previous()),
+    TokenType.IDENTIFIER: lambda parser: Variable(parser.previous()),
+    TokenType.LEFT_PAREN: Parser.grouping,
+}
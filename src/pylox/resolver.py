@@ -1,6 +1,5 @@
 import enum
-from collections import deque
-from typing import overload
+from typing import Any, Callable, Optional, overload
 
 from pylox import error
 from pylox.expr import (
@@ -62,17 +61,50 @@ class Resolver(ExprVisitor, StmtVisitor):
     __slots__ = (
         "interpreter",
         "scopes",
+        "locals",
         "current_class",
         "current_function",
+        "visits",
     )
 
     def __init__(self, interpreter: Interpreter):
         super().__init__()
         self.interpreter = interpreter
-        # dict[<variable name>: <is defined>]
-        self.scopes: deque[dict[str, VariableStatus]] = deque()
+        # dict[<variable name>: <is defined>], variables get their slots in insertion order
+        self.scopes: list[dict[str, VariableStatus]] = []
+        # dict[<variable name>: [(<scope index>, <slot>), ...]], innermost declaration last. Lets
+        # variables be resolved without searching the scopes.
+        self.locals: dict[str, list[tuple[int, int]]] = {}
         self.current_class = ClassType.NONE
         self.current_function = FunctionType.NONE
+        # Visit methods by node type, nodes are resolved with a single lookup instead of going
+        # through accept. Nodes with nothing to resolve map to None and aren't visited at all.
+        self.visits: dict[type, Optional[Callable[[Any], None]]] = {
+            Assign: self.visit_assign_expr,
+            Binary: self.visit_binary_expr,
+            Call: self.visit_call_expr,
+            Conditional: self.visit_conditional_expr,
+            Get: self.visit_get_expr,
+            Grouping: self.visit_grouping_expr,
+            Lambda: self.visit_lambda_expr,
+            Literal: None,
+            Logical: self.visit_logical_expr,
+            Set: self.visit_set_expr,
+            Super: self.visit_super_expr,
+            This: self.visit_this_expr,
+            Unary: self.visit_unary_expr,
+            Variable: self.visit_variable_expr,
+            Block: self.visit_block_stmt,
+            Break: None,
+            Class: self.visit_class_stmt,
+            Expression: self.visit_expression_stmt,
+            Function: self.visit_function_stmt,
+            If: self.visit_if_stmt,
+            Print: self.visit_print_stmt,
+            Return: self.visit_return_stmt,
+            Var: self.visit_var_stmt,
+            While: self.visit_while_stmt,
+        }
 
     @overload
     def resolve(self, target: list[Stmt]) -> None:  # noqa: U100
@@ -87,23 +119,38 @@ class Resolver(ExprVisitor, StmtVisitor):
         pass
 
     def resolve(self, target: list[Stmt] | Stmt | Expr) -> None:
-        if isinstance(target, Expr):
-            target.accept(self)
-        elif isinstance(target, Stmt):
-            target.accept(self)
-        else:
-            for stmt in target:
-                self.resolve(stmt)
-
-    def resolve_local(self, expr: Expr, name: Token, is_used: bool = False) -> None:
-        for i, scope in enumerate(self.scopes):
-            if name.lexeme in scope:
-                self.interpreter.resolve(expr, len(self.scopes) - 1 - i)
+        """Resolve any target, the visit methods call the specific variants directly"""
+        if isinstance(target, list):
+            self.resolve_block(target)
+        elif (visit := self.visits[type(target)]) is not None:
+            visit(target)
+
+    def resolve_block(self, statements: list[Stmt]) -> None:
+        visits = self.visits
+        for stmt in statements:
+            if (visit := visits[type(stmt)]) is not None:
+                visit(stmt)
+
+    def resolve_stmt(self, stmt: Stmt) -> None:
+        if (visit := self.visits[type(stmt)]) is not None:
+            visit(stmt)
+
+    def resolve_expr(self, expr: Expr) -> None:
+        if (visit := self.visits[type(expr)]) is not None:
+            visit(expr)
+
+    def resolve_local(
+        self, expr: Assign | Super | This | Variable, name: Token, is_used: bool = False
+    ) -> None:
+        declarations = self.locals.get(name.lexeme)
+        if not declarations:
+            return
 
-                if is_used:
-                    scope[name.lexeme] = VariableStatus.USED
+        index, slot = declarations[-1]
+        self.interpreter.resolve(expr, len(self.scopes) - 1 - index, slot)
 
-                return
+        if is_used:
+            self.scopes[index][name.lexeme] = VariableStatus.USED
 
     def resolve_function(self, function: Lambda, ftype: FunctionType) -> None:
         enclosing_function = self.current_function
@@ -113,7 +160,7 @@ class Resolver(ExprVisitor, StmtVisitor):
         for p in function.params:
             self.declare(p)
             self.define(p)
-        self.resolve(function.body)
+        self.resolve_block(function.body)
         self.end_scope()
 
         self.current_function = enclosing_function
@@ -122,29 +169,43 @@ class Resolver(ExprVisitor, StmtVisitor):
         self.scopes.append({})
 
     def end_scope(self) -> None:
-        self.scopes.pop()
+        for name in self.scopes.pop():
+            self.locals[name].pop()
+
+    def add_local(self, name: str, status: VariableStatus) -> bool:
+        """Set status of name in the innermost scope, return False if it was already there"""
+        scope = self.scopes[-1]
+        if name in scope:
+            scope[name] = status
+            return False
+        # Slots are given in declaration order
+        self.locals.setdefault(name, []).append((len(self.scopes) - 1, len(scope)))
+        scope[name] = status
+        return True
 
     def declare(self, name: Token) -> None:
-        if not len(self.scopes):
-            return
-        if name.lexeme in self.scopes[-1]:
-            error.error(name, "Already a variable with this name in this scope.")
-        self.scopes[-1][name.lexeme] = VariableStatus.DECLARED
+        if self.scopes and not self.add_local(name.lexeme, VariableStatus.DECLARED):
+            error.error_token(name, "Already a variable with this name in this scope.")
 
     def define(self, name: Token) -> None:
-        if not len(self.scopes):
-            return
-        self.scopes[-1][name.lexeme] = VariableStatus.DEFINED
+        if self.scopes:
+            self.add_local(name.lexeme, VariableStatus.DEFINED)
 
     def visit_block_stmt(self, stmt: Block) -> None:
+        # Blocks that declare nothing run in the enclosing environment, so they get no scope either
+        if not any(isinstance(s, (Var, Function, Class)) for s in stmt.statements):
+            self.interpreter.resolve_scopeless(stmt)
+            self.resolve_block(stmt.statements)
+            return
+
         self.begin_scope()
-        self.resolve(stmt.statements)
+        self.resolve_block(stmt.statements)
         self.end_scope()
 
     def visit_var_stmt(self, stmt: Var) -> None:
         self.declare(stmt.name)
         if stmt.initializer is not None:
-            self.resolve(stmt.initializer)
+            self.resolve_expr(stmt.initializer)
         self.define(stmt.name)
 
     def visit_class_stmt(self, stmt: Class) -> None:
@@ -154,18 +215,18 @@ class Resolver(ExprVisitor, StmtVisitor):
         self.declare(stmt.name)
 
         if stmt.superclass is not None and stmt.name.lexeme == stmt.superclass.name.lexeme:
-            error.error(stmt.superclass.name, "A class can't inherit from itself.")
+            error.error_token(stmt.superclass.name, "A class can't inherit from itself.")
 
         if stmt.superclass is not None:
             self.current_class = ClassType.SUBCLASS
-            self.resolve(stmt.superclass)
+            self.resolve_expr(stmt.superclass)
 
         if stmt.superclass is not None:
             self.begin_scope()
-            self.scopes[-1]["super"] = VariableStatus.USED
+            self.add_local("super", VariableStatus.USED)
 
         self.begin_scope()
-        self.scopes[-1]["this"] = VariableStatus.USED
+        self.add_local("this", VariableStatus.USED)
 
         for method in stmt.methods:
             declaration = FunctionType.METHOD
@@ -187,89 +248,107 @@ class Resolver(ExprVisitor, StmtVisitor):
         self.resolve_function(stmt.function, FunctionType.FUNCTION)
 
     def visit_expression_stmt(self, stmt: Expression) -> None:
-        self.resolve(stmt.expression)
+        self.resolve_expr(stmt.expression)
 
     def visit_if_stmt(self, stmt: If) -> None:
-        self.resolve(stmt.condition)
-        self.resolve(stmt.then_branch)
+        # The most common nodes with several children look their visits up directly instead of
+        # going through the resolve methods for each one
+        visits = self.visits
+        if (visit := visits[type(stmt.condition)]) is not None:
+            visit(stmt.condition)
+        if (visit := visits[type(stmt.then_branch)]) is not None:
+            visit(stmt.then_branch)
         if stmt.else_branch is not None:
-            self.resolve(stmt.else_branch)
+            self.resolve_stmt(stmt.else_branch)
 
     def visit_print_stmt(self, stmt: Print) -> None:
-        self.resolve(stmt.expression)
+        self.resolve_expr(stmt.expression)
 
     def visit_return_stmt(self, stmt: Return) -> None:
-        if self.current_function == FunctionType.NONE:
-            error.error(stmt.keyword, "Can't return from top-level code.")
+        if self.current_function is FunctionType.NONE:
+            error.error_token(stmt.keyword, "Can't return from top-level code.")
 
         if stmt.value is not None:
-            if self.current_function == FunctionType.INITIALIZER:
-                error.error(stmt.keyword, "Can't return a value from an initializer.")
-            self.resolve(stmt.value)
+            if self.current_function is FunctionType.INITIALIZER:
+                error.error_token(stmt.keyword, "Can't return a value from an initializer.")
+            self.resolve_expr(stmt.value)
 
     def visit_while_stmt(self, stmt: While) -> None:
-        self.resolve(stmt.condition)
-        self.resolve(stmt.body)
+        visits = self.visits
+        if (visit := visits[type(stmt.condition)]) is not None:
+            visit(stmt.condition)
+        if (visit := visits[type(stmt.body)]) is not None:
+            visit(stmt.body)
 
     def visit_break_stmt(self, stmt: Break) -> None:  # noqa: U100
         pass
 
     def visit_variable_expr(self, expr: Variable) -> None:
-        if len(self.scopes) and self.scopes[-1].get(expr.name.lexeme) == VariableStatus.DECLARED:
-            error.error(expr.name, "Can't read local variable in its own initializer.")
+        scopes = self.scopes
+        if scopes and scopes[-1].get(expr.name.lexeme) is VariableStatus.DECLARED:
+            error.error_token(expr.name, "Can't read local variable in its own initializer.")
         self.resolve_local(expr, expr.name, True)
 
     def visit_assign_expr(self, expr: Assign) -> None:
-        self.resolve(expr.value)
+        self.resolve_expr(expr.value)
         self.resolve_local(expr, expr.name)
 
     def visit_lambda_expr(self, expr: Lambda) -> None:
         self.resolve_function(expr, FunctionType.FUNCTION)
 
     def visit_binary_expr(self, expr: Binary) -> None:
-        self.resolve(expr.left)
-        self.resolve(expr.right)
+        visits = self.visits
+        if (visit := visits[type(expr.left)]) is not None:
+            visit(expr.left)
+        if (visit := visits[type(expr.right)]) is not None:
+            visit(expr.right)
 
     def visit_call_expr(self, expr: Call) -> None:
-        self.resolve(expr.callee)
+        visits = self.visits
+        if (visit := visits[type(expr.callee)]) is not None:
+            visit(expr.callee)
         for a in expr.arguments:
-            self.resolve(a)
+            if (visit := visits[type(a)]) is not None:
+                visit(a)
 
     def visit_grouping_expr(self, expr: Grouping) -> None:
-        self.resolve(expr.expression)
+        self.resolve_expr(expr.expression)
 
     def visit_literal_expr(self, expr: Literal) -> None:  # noqa: U100
         pass
 
     def visit_logical_expr(self, expr: Logical) -> None:
-        self.resolve(expr.left)
-        self.resolve(expr.right)
+        visits = self.visits
+        if (visit := visits[type(expr.left)]) is not None:
+            visit(expr.left)
+        if (visit := visits[type(expr.right)]) is not None:
+            visit(expr.right)
 
     def visit_unary_expr(self, expr: Unary) -> None:
-        self.resolve(expr.right)
+        self.resolve_expr(expr.right)
 
     def visit_conditional_expr(self, expr: Conditional) -> None:
-        self.resolve(expr.condition)
-        self.resolve(expr.if_true)
-        self.resolve(expr.if_false)
+        self.resolve_expr(expr.condition)
+        self.resolve_expr(expr.if_true)
+        self.resolve_expr(expr.if_false)
 
     def visit_get_expr(self, expr: Get) -> None:
-        self.resolve(expr.object)
+        self.resolve_expr(expr.object)
 
     def visit_set_expr(self, expr: Set) -> None:
-        self.resolve(expr.value)
-        self.resolve(expr.object)
+        self.resolve_expr(expr.value)
+        self.resolve_expr(expr.object)
 
     def visit_super_expr(self, expr: Super) -> None:
-        if self.current_class == ClassType.NONE:
-            error.error(expr.keyword, "Can't use 'super' outside of a class.")
-        elif self.current_class != ClassType.SUBCLASS:
-            error.error(expr.keyword, "Can't use 'super' in a class with no superclass.")
+        if self.current_class is ClassType.NONE:
+            error.error_token(expr.keyword, "Can't use 'super' outside of a class.")
+        elif self.current_class is not ClassType.SUBCLASS:
+            error.error_token(expr.keyword, "Can't use 'super' in a class with no superclass.")
 
         self.resolve_local(expr, expr.keyword)
 
     def visit_this_expr(self, expr: This) -> None:
-        if self.current_class == ClassType.NONE:
-            error.error(expr.keyword, "Can't use 'this' outside of a class.")
+        if self.current_class is ClassType.NONE:
+            error.error_token(expr.keyword, "Can't use 'this' outside of a class.")
 
         self.resolve_local(expr, expr.keyword)
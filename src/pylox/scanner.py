@@ -1,11 +1,14 @@
-from enum import Enum, auto
+import re
+import sys
+from enum import IntEnum, auto
 
 import pylox.error as error
 
 type LiteralValue = str | float | None
 
 
-class TokenType(Enum):
+# Integer valued, so that hashing and comparing the types in the parser's set lookups is done in C
+class TokenType(IntEnum):
     # Single-character tokens
     LEFT_PAREN = auto()
     RIGHT_PAREN = auto()
@@ -78,23 +81,75 @@ KEYWORDS: dict[str, TokenType] = {
     "break": TokenType.BREAK,
 }
 
+OPERATORS: dict[str, TokenType] = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "?": TokenType.TERNARY,
+    ":": TokenType.COLON,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+# Matches the common tokens and the whitespace before them, so that most of the source is scanned by
+# the regex engine. Block comments, strings spanning lines and errors don't match and are scanned a
+# character at a time instead, which keeps their handling in one place.
+TOKEN_PATTERN = re.compile(
+    r"""[ \t\r]*+(?:
+        (?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*+)
+        |(?P<OPERATOR>[!=<>]=|[(){},.\-+;*?:!=<>]|/(?![/*]))
+        |(?P<NUMBER>[0-9]++(?:\.[0-9]++)?+)
+        |(?P<NEWLINE>\n)
+        |(?P<STRING>"[^"\n]*+")
+        |(?P<COMMENT>//[^\n]*+)
+    )""",
+    re.VERBOSE,
+)
+
 
 class Token:
-    __slots__ = ("type", "lexeme", "literal", "line")
+    """Token without a literal value, like operators, keywords and names"""
 
-    def __init__(self, type: TokenType, lexeme: str, literal: LiteralValue, line: int) -> None:
+    __slots__ = ("type", "lexeme", "line")
+
+    literal: LiteralValue = None
+
+    def __init__(self, type: TokenType, lexeme: str, line: int) -> None:
         self.type = type
         self.lexeme = lexeme
-        self.literal = literal
         self.line = line
 
     def __str__(self) -> str:
-        return f"{self.type} {self.lexeme} {self.literal} {self.line}"
+        return f"TokenType.{self.type.name} {self.lexeme} {self.literal} {self.line}"
 
     def __repr__(self) -> str:
         return str(self)
 
 
+class LiteralToken(Token):
+    """Number or string token, only these need the extra slot for their value"""
+
+    __slots__ = ("literal",)
+
+    def __init__(self, type: TokenType, lexeme: str, literal: LiteralValue, line: int) -> None:
+        super().__init__(type, lexeme, line)
+        self.literal = literal
+
+
 class Scanner:
     __slots__ = ("source", "tokens", "start", "current", "line")
 
@@ -113,7 +168,10 @@ class Scanner:
 
     def add_token(self, type: TokenType, literal: LiteralValue = None) -> None:
         text = self.source[self.start : self.current]
-        self.tokens.append(Token(type, text, literal, self.line))
+        if literal is None:
+            self.tokens.append(Token(type, text, self.line))
+        else:
+            self.tokens.append(LiteralToken(type, text, literal, self.line))
 
     def match(self, expected: str) -> bool:
         if self.is_at_end():
@@ -134,27 +192,28 @@ class Scanner:
         return self.source[self.current + 1]
 
     def string(self) -> None:
-        while self.peek() != '"' and not self.is_at_end():
-            if self.peek() == "\n":
-                self.line += 1
-            self.advance()
-
-        if self.is_at_end():
-            error.error(self.line, "Unterminated string.")
+        # Only strings spanning lines get here, so the closing quote is searched for in one go
+        end = self.source.find('"', self.current)
+        if end == -1:
+            self.line += self.source.count("\n", self.current)
+            self.current = len(self.source)
+            error.error_line(self.line, "Unterminated string.")
             return
 
+        self.line += self.source.count("\n", self.current, end)
         # The closing ".
-        self.advance()
+        self.current = end + 1
 
         # Trim surrounding quotes
         value = self.source[self.start + 1 : self.current - 1]
         self.add_token(TokenType.STRING, value)
 
+    # Lox names and numbers are ASCII, str.isdigit and str.isalpha would accept far more
     def is_digit(self, char: str) -> bool:
-        return char.isdigit()
+        return "0" <= char <= "9"
 
     def is_alpha(self, char: str) -> bool:
-        return char.isalpha() or char == "_"
+        return "a" <= char <= "z" or "A" <= char <= "Z" or char == "_"
 
     def is_alpha_numeric(self, char) -> bool:
         return self.is_digit(char) or self.is_alpha(char)
@@ -173,7 +232,9 @@ class Scanner:
     def identifier(self) -> None:
         while self.is_alpha_numeric(self.peek()):
             self.advance()
-        self.add_token(KEYWORDS.get(self.source[self.start : self.current], TokenType.IDENTIFIER))
+        # Interned names make the dictionary lookups of variables and fields identity checks
+        text = sys.intern(self.source[self.start : self.current])
+        self.tokens.append(Token(KEYWORDS.get(text, TokenType.IDENTIFIER), text, self.line))
 
     def scan_single_token(self) -> None:
         char = self.advance()
@@ -217,14 +278,14 @@ class Scanner:
                     while self.peek() != "\n" and not self.is_at_end():
                         self.advance()
                 elif self.match("*"):
-                    while not self.is_at_end() and self.advance() != "*":
-                        pass
-                    if self.is_at_end():
-                        error.error(self.line, "Unclosed block comment.")
-                    elif self.peek() != "/":
-                        error.error(self.line, "Unexpected character.")
+                    end = self.source.find("*/", self.current)
+                    if end == -1:
+                        self.line += self.source.count("\n", self.current)
+                        self.current = len(self.source)
+                        error.error_line(self.line, "Unclosed block comment.")
                     else:
-                        self.advance()
+                        self.line += self.source.count("\n", self.current, end)
+                        self.current = end + 2
                 else:
                     self.add_token(TokenType.SLASH)
             # "Meaningless" characters
@@ -241,13 +302,47 @@ class Scanner:
                 elif self.is_alpha(char):
                     self.identifier()
                 else:
-                    error.error(self.line, "Unexpected character.")
+                    error.error_line(self.line, "Unexpected character.")
 
     def scan_tokens(self) -> list[Token]:
-        while not self.is_at_end():
-            self.start = self.current
-            self.scan_single_token()
-        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        source = self.source
+        length = len(source)
+        append = self.tokens.append
+        match_token = TOKEN_PATTERN.match
+        position = self.current
+        line = self.line
+
+        while position < length:
+            token = match_token(source, position)
+            if token is None:
+                self.start = self.current = position
+                self.line = line
+                self.scan_single_token()
+                position = self.current
+                line = self.line
+                continue
+
+            position = token.end()
+            kind = token.lastgroup
+            if kind == "IDENTIFIER":
+                # Interned names make the dictionary lookups of variables and fields identity checks
+                text = sys.intern(token["IDENTIFIER"])
+                append(Token(KEYWORDS.get(text, TokenType.IDENTIFIER), text, line))
+            elif kind == "OPERATOR":
+                text = token["OPERATOR"]
+                append(Token(OPERATORS[text], text, line))
+            elif kind == "NUMBER":
+                text = token["NUMBER"]
+                append(LiteralToken(TokenType.NUMBER, text, float(text), line))
+            elif kind == "NEWLINE":
+                line += 1
+            elif kind == "STRING":
+                text = token["STRING"]
+                append(LiteralToken(TokenType.STRING, text, text[1:-1], line))
+
+        self.current = position
+        self.line = line
+        self.tokens.append(Token(TokenType.EOF, "", self.line))
         return self.tokens
 
     def is_at_end(self) -> bool:
@@ -1,12 +1,15 @@
-from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from pylox import expr
 from pylox.scanner import Token
 
 
-class Stmt(ABC):
-    @abstractmethod
+class Stmt:
+    __slots__ = ()
+
+    # Set on each node class by the interpreter, called with it and the node
+    interpret: Callable[[Any, Any], Any]
+
     def accept(self, visitor: "StmtVisitor"):  # noqa: U100
         raise NotImplementedError()
 
@@ -14,11 +17,11 @@ class Stmt(ABC):
 class Block(Stmt):
     """Block statement"""
 
-    __slots___ = ("statements",)
+    __slots__ = ("statements", "scopeless")
 
     def __init__(self, statements: list[Stmt]) -> None:
-        super().__init__()
         self.statements = statements
+        self.scopeless: Optional[bool] = None
 
     def accept(self, visitor: "StmtVisitor"):
         return visitor.visit_block_stmt(self)
@@ -27,10 +30,9 @@ class Block(Stmt):
 class Class(Stmt):
     """Class statement"""
 
-    __slots___ = ("name", "superclass", "methods")
+    __slots__ = ("name", "superclass", "methods")
 
     def __init__(self, name: Token, superclass: Optional["expr.Variable"], methods: list["Function"]) -> None:
-        super().__init__()
         self.name = name
         self.superclass = superclass
         self.methods = methods
@@ -42,10 +44,7 @@ class Class(Stmt):
 class Break(Stmt):
     """Break statement"""
 
-    __slots___ = ()
-
-    def __init__(self) -> None:
-        super().__init__()
+    __slots__ = ()
 
     def accept(self, visitor: "StmtVisitor"):
         return visitor.visit_break_stmt(self)
@@ -54,10 +53,9 @@ class Break(Stmt):
 class Expression(Stmt):
     """Expression statement"""
 
-    __slots___ = ("expression",)
+    __slots__ = ("expression",)
 
     def __init__(self, expression: "expr.Expr") -> None:
-        super().__init__()
         self.expression = expression
 
     def accept(self, visitor: "StmtVisitor"):
@@ -67,10 +65,9 @@ class Expression(Stmt):
 class Function(Stmt):
     """Function statement"""
 
-    __slots___ = ("name", "function")
+    __slots__ = ("name", "function")
 
     def __init__(self, name: Token, function: "expr.Lambda") -> None:
-        super().__init__()
         self.name = name
         self.function = function
 
@@ -81,10 +78,9 @@ class Function(Stmt):
 class If(Stmt):
     """If statement"""
 
-    __slots___ = ("condition", "then_branch", "else_branch")
+    __slots__ = ("condition", "then_branch", "else_branch")
 
     def __init__(self, condition: "expr.Expr", then_branch: Stmt, else_branch: Stmt | None) -> None:
-        super().__init__()
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
@@ -96,10 +92,9 @@ class If(Stmt):
 class Print(Stmt):
     """Print statement"""
 
-    __slots___ = ("expression",)
+    __slots__ = ("expression",)
 
     def __init__(self, expression: "expr.Expr") -> None:
-        super().__init__()
         self.expression = expression
 
     def accept(self, visitor: "StmtVisitor"):
@@ -109,10 +104,9 @@ class Print(Stmt):
 class Return(Stmt):
     """Return statement"""
 
-    __slots___ = ("keyword", "value")
+    __slots__ = ("keyword", "value")
 
     def __init__(self, keyword: Token, value: Optional["expr.Expr"]) -> None:
-        super().__init__()
         self.keyword = keyword
         self.value = value
 
@@ -123,10 +117,9 @@ class Return(Stmt):
 class Var(Stmt):
     """Var statement"""
 
-    __slots___ = ("name", "initializer")
+    __slots__ = ("name", "initializer")
 
     def __init__(self, name: Token, initializer: Optional["expr.Expr"]) -> None:
-        super().__init__()
         self.name = name
         self.initializer = initializer
 
@@ -137,10 +130,9 @@ class Var(Stmt):
 class While(Stmt):
     """While statement"""
 
-    __slots___ = ("condition", "body")
+    __slots__ = ("condition", "body")
 
     def __init__(self, condition: "expr.Expr", body: Stmt) -> None:
-        super().__init__()
         self.condition = condition
         self.body = body
 
@@ -148,43 +140,33 @@ class While(Stmt):
         return visitor.visit_while_stmt(self)
 
 
-class StmtVisitor(ABC):
-    @abstractmethod
+class StmtVisitor:
     def visit_block_stmt(self, stmt: Block):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_class_stmt(self, stmt: Class):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_break_stmt(self, stmt: Break):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_expression_stmt(self, stmt: Expression):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_function_stmt(self, stmt: Function):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_if_stmt(self, stmt: If):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_print_stmt(self, stmt: Print):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_return_stmt(self, stmt: Return):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_var_stmt(self, stmt: Var):  # noqa: U100
         raise NotImplementedError()
 
-    @abstractmethod
     def visit_while_stmt(self, stmt: While):  # noqa: U100
         raise NotImplementedError()
@@ -1,14 +1,69 @@
 import argparse
-from io import TextIOWrapper
 from pathlib import Path
+from typing import NamedTuple
+
+# Imports and the base class shared by the generated modules. Plain classes instead of ABCs, so
+# that creating nodes doesn't go through ABCMeta.
+HEADER_TEMPLATE = """\
+from typing import Any, Callable, Optional
+
+from pylox import {imported_module}
+from pylox.scanner import Token
+
+
+class {base_name}:
+    __slots__ = ()
+
+    # Set on each node class by the interpreter, called with it and the node
+    interpret: Callable[[Any, Any], Any]
+
+    def accept(self, visitor: "{base_name}Visitor"):  # noqa: U100
+        raise NotImplementedError()
+
+"""
+
+# Layout of a generated node class, filled in with one format call per class
+CLASS_TEMPLATE = '''\
+class {class_name}({base_name}):
+    """{class_name} {doc_name}"""
+
+    __slots__ = ({slots})
+
+{init}    def accept(self, visitor: "{base_name}Visitor"):
+        return visitor.visit_{class_lower}_{base_lower}(self)
+'''
+
+INIT_TEMPLATE = """\
+    def __init__(self{parameters}) -> None:
+{assignments}
+"""
+
+
+class NodeType(NamedTuple):
+    """Parsed node type, fields are (type, name) pairs"""
+
+    name: str
+    # Used in the visitor method names
+    lower_name: str
+    fields: list[tuple[str, str]]
+    # Set after parsing, not passed to __init__ and start out as None
+    late_fields: list[tuple[str, str]]
 
 
 class WriteLn:
-    def __init__(self, file: TextIOWrapper):
-        self.file = file
+    """Collects the lines of a generated module, which is then written to its file at once"""
 
-    def writeln(self, line: str) -> int:
-        return self.file.write(line + "\n")
+    def __init__(self) -> None:
+        self.buffer: list[str] = []
+
+    def write(self, text: str) -> None:
+        self.buffer.append(text)
+
+    def writeln(self, line: str) -> None:
+        self.buffer += (line, "\n")
+
+    def getvalue(self) -> str:
+        return "".join(self.buffer)
 
 
 def generate_ast(output_dir: Path) -> None:
@@ -16,7 +71,7 @@ def generate_ast(output_dir: Path) -> None:
         output_dir,
         "Expr",
         [
-            "Assign       : Token name, Expr value",
+            "Assign       : Token name, Expr value; Optional[tuple[int, int]] local",
             "Binary       : Expr left, Token operator, Expr right",
             "Call         : Expr callee, Token paren, list[Expr] arguments",
             "Get          : Expr object, Token name",
@@ -25,20 +80,21 @@ def generate_ast(output_dir: Path) -> None:
             "Literal      : Any value",
             "Logical      : Expr left, Token operator, Expr right",
             "Set          : Expr object, Token name, Expr value",
-            "Super        : Token keyword, Token method",
-            "This         : Token keyword",
+            "Super        : Token keyword, Token method; Optional[tuple[int, int]] local",
+            "This         : Token keyword; Optional[tuple[int, int]] local",
             "Unary        : Token operator, Expr right",
             "Conditional  : Expr condition, Expr if_true, Expr if_false",
-            "Variable     : Token name",
+            "Variable     : Token name; Optional[tuple[int, int]] local",
         ],
         "expression",
+        "stmt",
     )
 
     define_ast(
         output_dir,
         "Stmt",
         [
-            "Block       : list[Stmt] statements",
+            "Block       : list[Stmt] statements; Optional[bool] scopeless",
             'Class       : Token name, Optional["expr.Variable"] superclass, '
             'list["Function"] methods',
             "Break       :",
@@ -51,100 +107,109 @@ def generate_ast(output_dir: Path) -> None:
             'While       : "expr.Expr" condition, Stmt body',
         ],
         "statement",
+        "expr",
     )
 
 
-def define_ast(output_dir: Path, base_name: str, types: list[str], doc_name: str) -> None:
-    with open(output_dir.joinpath(f"{base_name.lower()}.py"), "w") as fs:
-        file = WriteLn(fs)
-
-        if base_name.lower() == "expr":
-            define_imports_expr(file)
-        if base_name.lower() == "stmt":
-            define_imports_stmt(file)
+def parse_fields(fields: str, separator: str) -> list[tuple[str, str]]:
+    """Split "Type name" pairs, the type is everything before the last run of whitespace
 
-        define_base_class(file, base_name)
-
-        # AST classes
-        for t in types:
-            file.writeln("")
-            class_name, fields = map(lambda s: s.strip(), t.split(":"))
-            define_type(file, base_name, class_name, fields, doc_name)
-            file.writeln("")
-
-        file.writeln("")
-        define_visitor(file, base_name, types)
+    Plain string splits are enough for the grammar, so no regular expressions are needed.
+    """
+    if not fields:
+        return []
+    pairs = []
+    for field in fields.split(separator):
+        var_type, var_name = field.strip().rsplit(maxsplit=1)
+        pairs.append((var_type, var_name))
+    return pairs
 
 
-def define_imports_expr(file: WriteLn) -> None:
-    file.writeln("from abc import ABC, abstractmethod")
-    file.writeln("from typing import Any")
-    file.writeln("")
-    file.writeln("from pylox import stmt")
-    file.writeln("from pylox.scanner import Token")
-    file.writeln("\n")
+def parse_types(types: list[str]) -> list[NodeType]:
+    """Parse "Name : Type field, ...; Type late_field; ..." specifications once for all emitters"""
+    parsed = []
+    for t in types:
+        class_name, _, fields = t.partition(":")
+        class_name = class_name.strip()
+        fields, _, late_fields = fields.partition(";")
+        # Types of late fields may contain commas, so they are separated with ";" instead
+        parsed.append(
+            NodeType(
+                class_name,
+                class_name.lower(),
+                parse_fields(fields.strip(), ","),
+                parse_fields(late_fields.strip(), ";"),
+            )
+        )
+    return parsed
 
 
-def define_imports_stmt(file: WriteLn) -> None:
-    file.writeln("from abc import ABC, abstractmethod")
-    file.writeln("from typing import Optional")
-    file.writeln("")
-    file.writeln("from pylox import expr")
-    file.writeln("from pylox.scanner import Token")
-    file.writeln("\n")
+def define_ast(
+    output_dir: Path, base_name: str, types: list[str], doc_name: str, imported_module: str
+) -> None:
+    source = render_module(base_name, types, doc_name, imported_module)
+    path = output_dir.joinpath(f"{base_name.lower()}.py")
+    # Unchanged modules are left untouched, so that their cached bytecode stays valid
+    if path.is_file() and path.read_bytes() == source.encode("utf-8"):
+        return
+    # Written in one call, with "\n" line endings on every platform like the checked in modules
+    path.write_text(source, "utf-8", newline="\n")
 
 
-def define_base_class(file: WriteLn, base_name: str) -> None:
-    file.writeln(f"class {base_name}(ABC):")
-    file.writeln("    @abstractmethod")
-    file.writeln(f'    def accept(self, visitor: "{base_name}Visitor"):  # noqa: U100')
-    file.writeln("        raise NotImplementedError()")
-    file.writeln("")
+def render_module(base_name: str, types: list[str], doc_name: str, imported_module: str) -> str:
+    node_types = parse_types(types)
+    file = WriteLn()
+    file.write(HEADER_TEMPLATE.format(imported_module=imported_module, base_name=base_name))
 
+    for node_type in node_types:
+        file.writeln("")
+        define_type(file, base_name, node_type, doc_name)
+        file.writeln("")
 
-def define_type(file: WriteLn, base_name: str, class_name: str, fields: str, doc_name: str) -> None:
-    # (type, name)
-    variables = [tuple(i.rsplit(" ", maxsplit=1)) for i in fields.split(", ")]
-    if not fields:
-        variables = []
-
-    file.writeln(f"class {class_name}({base_name}):")
-    file.writeln(f'    """{class_name} {doc_name}"""\n')
-
-    if not variables:
-        slots = ""
-    else:
-        slots = ", ".join(f'"{var_name}"' for (_, var_name) in variables)
-    if len(variables) == 1:
-        slots += ","
-    file.writeln(f"    __slots___ = ({slots})")
     file.writeln("")
+    define_visitor(file, base_name, node_types)
+    return file.getvalue()
+
+
+def define_type(file: WriteLn, base_name: str, node_type: NodeType, doc_name: str) -> None:
+    class_name, class_lower, variables, late_variables = node_type
+
+    slot_names = [f'"{var_name}"' for (_, var_name) in variables + late_variables]
+    # A trailing comma only where the tuple needs one, the generated code stays as black formats it
+    slots = f"{slot_names[0]}," if len(slot_names) == 1 else ", ".join(slot_names)
+
+    # Nodes without fields can use the __init__ of object
+    init = ""
+    if slot_names:
+        init = INIT_TEMPLATE.format(
+            parameters="".join(f", {va_name}: {var_type}" for (var_type, va_name) in variables),
+            assignments="".join(
+                [f"        self.{i_n} = {i_n}\n" for _, i_n in variables]
+                + [f"        self.{l_n}: {l_t} = None\n" for l_t, l_n in late_variables]
+            ),
+        )
 
-    if not variables:
-        file.writeln("    def __init__(self) -> None:")
-    else:
-        init_header = ", ".join(f"{va_name}: {var_type}" for (var_type, va_name) in variables)
-        file.writeln(f"    def __init__(self, {init_header}) -> None:")
-    file.writeln("        super().__init__()")
-
-    # Fields
-    for _, i_n in variables:
-        file.writeln(f"        self.{i_n} = {i_n}")
-    file.writeln("")
-    file.writeln(f'    def accept(self, visitor: "{base_name}Visitor"):')
-    file.writeln(f"        return visitor.visit_{class_name.lower()}_{base_name.lower()}(self)")
+    file.write(
+        CLASS_TEMPLATE.format(
+            class_name=class_name,
+            base_name=base_name,
+            doc_name=doc_name,
+            slots=slots,
+            init=init,
+            class_lower=class_lower,
+            base_lower=base_name.lower(),
+        )
+    )
 
 
-def define_visitor(file: WriteLn, base_name: str, types: list[str]) -> None:
-    file.file.write(f"class {base_name}Visitor(ABC):")
+def define_visitor(file: WriteLn, base_name: str, node_types: list[NodeType]) -> None:
+    file.write(f"class {base_name}Visitor:")
     base_lower = base_name.lower()
 
-    for t in types:
+    for type_name, type_lower, _, _ in node_types:
         file.writeln("")
-        type_name = t.split(":")[0].strip()
-        file.writeln("    @abstractmethod")
         file.writeln(
-            f"    def visit_{type_name.lower()}_{base_lower}(self, {base_lower}: {type_name}):"
+            f"    def visit_{type_lower}_{base_lower}(self, {base_lower}: {type_name}):"
             "  # noqa: U100"
         )
         file.writeln("        raise NotImplementedError()")
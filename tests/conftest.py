@@ -0,0 +1,8 @@
+import pytest
+
+from pylox.error import had_error
+
+
+@pytest.fixture(autouse=True)
+def reset_errors():
+    had_error[:] = bytes(len(had_error))
@@ -20,4 +20,13 @@ def test_block_comments_error(capsys):
         1;
     """
     run(source)
-    assert capsys.readouterr()[1].startswith("[line 1] Error: Unexpected character.")
+    assert capsys.readouterr()[1].startswith("[line 5] Error: Unclosed block comment.")
+
+
+def test_block_comments_lines(capsys):
+    source = """\
+        /* a * b
+        */ print 1 +;
+    """
+    run(source)
+    assert capsys.readouterr()[1] == "[line 2] Error at ';': Expected expression.\n"
@@ -0,0 +1,26 @@
+from pylox.main import run
+
+
+def test_compiled_expressions(capsys):
+    source = """\
+        var compiled_a = 3;
+        {
+            var b = 4;
+            print (compiled_a + b) * (b - compiled_a) / 2 < b;
+            print compiled_a > 1 and b > 1 ? "both" : "none";
+            print nil or compiled_a == 3 and !(b != 4);
+            b = compiled_a = compiled_a * b - 1 + 1;
+            print b;
+        }
+    """
+    run(source)
+    assert capsys.readouterr()[0] == "true\nboth\ntrue\n12\n"
+
+
+def test_compiled_runtime_error(capsys):
+    source = """\
+        var compiled_c = "a";
+        print compiled_c + 1 - 2 * 3 / 4;
+    """
+    run(source)
+    assert capsys.readouterr()[0] == "Operands must be numbers.\n[line 2]\n"
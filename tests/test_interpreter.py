@@ -0,0 +1,127 @@
+import pytest
+
+from pylox.interpreter import stringify
+from pylox.lox import MAX_PROGRAMS, PROGRAMS
+from pylox.main import run
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, "nil"),
+        (True, "true"),
+        (False, "false"),
+        (3.0, "3"),
+        (-3.0, "-3"),
+        (0.0, "0"),
+        (-0.0, "-0"),
+        (1.5, "1.5"),
+        (1e16, "1e+16"),
+        ("text", "text"),
+    ],
+)
+def test_stringify(value, expected):
+    assert stringify(value) == expected
+
+
+def test_blocks_without_declarations(capsys):
+    source = """\
+        fun outer() {
+            var a = 1;
+            {
+                {
+                    var b = 2;
+                    fun f() { return a + b; }
+                    { a = a + 10; }
+                    print f();
+                }
+                print a;
+            }
+        }
+        outer();
+    """
+    run(source)
+    assert capsys.readouterr()[0] == "13\n11\n"
+
+
+def test_environment_after_runtime_error(capsys):
+    run("{ var inner = 1; print inner + nil; }")
+    run("var after_error = 2; print after_error;")
+    assert capsys.readouterr()[0] == "Operands must be two numbers or two strings.\n[line 1]\n2\n"
+
+
+def test_return_and_break_unwind_blocks(capsys):
+    source = """\
+        fun find(limit) {
+            var i = 0;
+            while (true) {
+                { var step = 1; i = i + step; }
+                if (i == limit) { var found = i; return found; }
+            }
+        }
+        var outside = "outside";
+        {
+            var inner = "inner";
+            print find(3);
+            while (true) { var k = 1; { break; } }
+            print inner;
+        }
+        print outside;
+    """
+    run(source)
+    assert capsys.readouterr()[0] == "3\ninner\noutside\n"
+
+
+def test_folded_branches(capsys):
+    source = """\
+        var folded = 1;
+        if (true) { var folded = 2; print folded; } else print 3;
+        while (false) print 4;
+        print nil or folded;
+        print false and folded;
+    """
+    run(source)
+    assert capsys.readouterr()[0] == "2\n1\nfalse\n"
+
+
+def test_dead_code_is_resolved(capsys):
+    run("if (false) print this;")
+    message = "[line 1] Error at 'this': Can't use 'this' outside of a class.\n"
+    assert capsys.readouterr()[1] == message
+
+
+def test_shadowed_local(capsys):
+    source = """\
+        fun shadow() {
+            var a = "outer";
+            {
+                var a = "inner";
+                print a;
+            }
+            print a;
+        }
+        shadow();
+    """
+    run(source)
+    assert capsys.readouterr()[0] == "inner\nouter\n"
+
+
+def test_break_inside_function_in_loop(capsys):
+    source = """\
+        while (true) {
+            fun f() { break; }
+            f();
+        }
+    """
+    run(source)
+    message = "[line 2] Error at 'break': Must be inside a loop to use 'break'.\n"
+    assert capsys.readouterr()[1] == message
+
+
+def test_evicted_program_functions(capsys):
+    run("fun evicted(a) { { var b = a * 2; print b + 1; } { print a - 1; } }")
+    for i in range(MAX_PROGRAMS):
+        run(f"var evict_{i} = {i};")
+    assert len(PROGRAMS) == MAX_PROGRAMS
+    run("evicted(3);")
+    assert capsys.readouterr()[0] == "7\n2\n"
@@ -0,0 +1,33 @@
+from pylox.main import run
+from pylox.scanner import Scanner, TokenType
+
+
+def test_scanned_tokens():
+    source = """\
+        var name_1 = "a
+b"; // comment
+        /* block */ print 1.5 >= x / 2;
+    """
+    tokens = Scanner(source).scan_tokens()
+    assert [(token.type, token.lexeme, token.literal, token.line) for token in tokens] == [
+        (TokenType.VAR, "var", None, 1),
+        (TokenType.IDENTIFIER, "name_1", None, 1),
+        (TokenType.EQUAL, "=", None, 1),
+        (TokenType.STRING, '"a\nb"', "a\nb", 2),
+        (TokenType.SEMICOLON, ";", None, 2),
+        (TokenType.PRINT, "print", None, 3),
+        (TokenType.NUMBER, "1.5", 1.5, 3),
+        (TokenType.GREATER_EQUAL, ">=", None, 3),
+        (TokenType.IDENTIFIER, "x", None, 3),
+        (TokenType.SLASH, "/", None, 3),
+        (TokenType.NUMBER, "2", 2.0, 3),
+        (TokenType.SEMICOLON, ";", None, 3),
+        (TokenType.EOF, "", None, 4),
+    ]
+
+
+def test_non_ascii_characters(capsys):
+    run("print 1²;\nvar café;")
+    assert capsys.readouterr()[1] == (
+        "[line 1] Error: Unexpected character.\n[line 2] Error: Unexpected character.\n"
+    )